@@ -1,9 +1,11 @@
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field, ConfigDict
 import psycopg2
+from psycopg2.extras import execute_values
+import orjson
 import os
+import time
 from typing import Optional, List, Dict, Any
-from datetime import datetime
 from utils.helper import DatabaseConnection
 
 
@@ -19,46 +21,59 @@ class QueryExecutorTool(BaseTool):
     
     args_schema: type = ArgsSchema
     
-    def _run(self, **kwargs) -> Dict[str, Any]:
-        """Execute a SQL query and return results"""
+    def _execute(self, query: str, params: Optional[tuple] = None):
+        """Run a query and return (columns, rows, rowcount); columns and rows are None for non-SELECT"""
+        db = DatabaseConnection()
+        with db.get_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(query, params or ())
+                
+                if query.strip().upper().startswith('SELECT'):
+                    # Fetch column names and raw row tuples
+                    columns = [desc[0] for desc in cur.description]
+                    return columns, cur.fetchall(), None
+                
+                # For INSERT, UPDATE, DELETE operations
+                conn.commit()
+                return None, None, cur.rowcount
+    
+    def _result(self, query: Optional[str], params: Optional[tuple], row_dicts: bool) -> Dict[str, Any]:
+        """Execute a SQL query and build the result payload; SELECT rows become dicts only if row_dicts"""
         try:
-            # Extract parameters from kwargs
-            query = kwargs.get('query')
-            params = kwargs.get('params')
-            
             if not query:
                 return {"status": "error", "message": "Query parameter is required"}
             
-            db = DatabaseConnection()
-            with db.get_connection() as conn:
-                with conn.cursor() as cur:
-                    cur.execute(query, params or ())
-                    
-                    if query.strip().upper().startswith('SELECT'):
-                        # Fetch column names
-                        columns = [desc[0] for desc in cur.description]
-                        # Fetch all rows
-                        rows = cur.fetchall()
-                        # Convert to list of dictionaries
-                        data = [dict(zip(columns, row)) for row in rows]
-                        return {
-                            "status": "success",
-                            "data": data,
-                            "row_count": len(data)
-                        }
-                    else:
-                        # For INSERT, UPDATE, DELETE operations
-                        conn.commit()
-                        return {
-                            "status": "success",
-                            "row_count": cur.rowcount,
-                            "message": f"Query executed successfully. {cur.rowcount} rows affected."
-                        }
+            columns, rows, rowcount = self._execute(query, params)
+            if columns is None:
+                return {
+                    "status": "success",
+                    "row_count": rowcount,
+                    "message": f"Query executed successfully. {rowcount} rows affected."
+                }
+            if row_dicts:
+                # Convert to list of dictionaries
+                data = [dict(zip(columns, row)) for row in rows]
+                return {"status": "success", "data": data, "row_count": len(data)}
+            # Rows stay as tuples; orjson encodes them in a single pass
+            return {"status": "success", "columns": columns, "rows": rows, "row_count": len(rows)}
         except Exception as e:
             return {
                 "status": "error",
                 "message": str(e)
             }
+    
+    def run_query(self, **kwargs) -> Dict[str, Any]:
+        """Execute a SQL query and return results as a dict with one dict per row (for in-process callers)"""
+        return self._result(kwargs.get('query'), kwargs.get('params'), row_dicts=True)
+    
+    def _run(self, **kwargs) -> str:
+        """Execute a SQL query and return the results pre-serialized as a JSON string"""
+        payload = self._result(kwargs.get('query'), kwargs.get('params'), row_dicts=False)
+        # Decimal and other non-native types fall back to their string form
+        return orjson.dumps(payload, default=str, option=orjson.OPT_NAIVE_UTC).decode()
+
+# Shared executor for the product code tools; it holds no per-call state
+_EXECUTOR = QueryExecutorTool()
 
 class QueryStatusTool(BaseTool):
     name: str = "query_status_checker"
@@ -92,13 +107,18 @@ class QueryStatusTool(BaseTool):
                             SELECT pid, state, query, query_start 
                             FROM pg_stat_activity 
                             WHERE query ILIKE %s AND state = 'active'
+                              AND datname = current_database()
+                              AND backend_type = 'client backend'
                         """, (f"%{query_text}%",))
                     else:
-                        # If no parameters provided, show all active queries
+                        # If no parameters provided, show all active queries.
+                        # Only client backends of this database are of interest.
                         cur.execute("""
                             SELECT pid, state, query, query_start 
                             FROM pg_stat_activity 
                             WHERE state = 'active'
+                              AND datname = current_database()
+                              AND backend_type = 'client backend'
                         """)
                     
                     result = cur.fetchone()
@@ -155,6 +175,8 @@ class ConnectionInfoTool(BaseTool):
                                MAX(backend_start) as latest_connection
                         FROM pg_stat_activity
                         WHERE state = 'active'
+                          AND datname = current_database()
+                          AND backend_type = 'client backend'
                     """)
                     result = cur.fetchone()
                     return f"Active connections: {result[0]}, Latest: {result[1]}"
@@ -178,6 +200,19 @@ class WeatherTool(BaseTool):
         return f"Weather in {city}: 72°F, Sunny"
 
 
+# Medicare Advantage plan attributes keyed by product code marker:
+# (product_name, copay, deductible, out_of_pocket_max, coinsurance_percentage)
+PLAN_TABLE = {
+    'PLUS': ("Medicare Advantage Plus Plan 2025", 20.00, 1000.00, 6000.00, 15),
+    'PREM': ("Medicare Advantage Premium Plan 2025", 15.00, 500.00, 4000.00, 10),
+    '': ("Medicare Advantage Standard Plan 2025", 25.00, 1500.00, 8000.00, 20),
+}
+
+def _plan_key(code: str) -> str:
+    """Return the PLAN_TABLE key for a product code ('' for the standard plan)"""
+    return next((k for k in ('PLUS', 'PREM') if k in code), '')
+
+
 class ProductCodeManagerTool(BaseTool):
     name: str = "product_code_manager"
     description: str = "Search for product codes in the database and insert new Medicare Advantage product codes if they don't exist"
@@ -201,69 +236,38 @@ class ProductCodeManagerTool(BaseTool):
             ]
         
         try:
-            executor = QueryExecutorTool()
-            
-            # Step 1: Search for existing product codes
-            placeholders = ', '.join(['%s'] * len(product_codes))
-            search_query = f"""
-                SELECT product_code, product_name, product_type, category, effective_date 
-                FROM product_catalog 
-                WHERE product_code IN ({placeholders})
+            # Search and insert in one round trip: ON CONFLICT skips codes that
+            # already exist and RETURNING reports exactly the rows inserted
+            upsert_query = """
+                INSERT INTO product_catalog (
+                    product_code, product_name, product_type, category, 
+                    subcategory, network_type, copay_amount, deductible_amount,
+                    out_of_pocket_max, coinsurance_percentage, prescription_coverage,
+                    dental_coverage, vision_coverage, mental_health_coverage,
+                    effective_date, state_availability, age_restrictions
+                ) VALUES %s
+                ON CONFLICT (product_code) DO NOTHING
+                RETURNING product_code
             """
             
-            search_result = executor._run(query=search_query, params=tuple(product_codes))
-            
-            if search_result["status"] != "success":
-                return search_result
+            rows = []
+            for code in dict.fromkeys(product_codes):
+                product_name, copay, deductible, oop_max, coinsurance = PLAN_TABLE[_plan_key(code)]
+                rows.append((
+                    code, product_name, 'Medicare Advantage', 'Medicare', 'Senior',
+                    'In-Network Only', copay, deductible, oop_max, coinsurance,
+                    True, True, True, True, '2025-01-01', 'All States', '65+'
+                ))
             
-            existing_codes = [row["product_code"] for row in search_result["data"]]
-            missing_codes = [code for code in product_codes if code not in existing_codes]
+            db = DatabaseConnection()
+            with db.get_connection() as conn:
+                with conn.cursor() as cur:
+                    inserted = execute_values(cur, upsert_query, rows, fetch=True)
+                conn.commit()
             
-            # Step 2: Insert missing product codes
-            inserted_codes = []
-            if missing_codes:
-                for code in missing_codes:
-                    # Determine product details based on code
-                    if 'PLUS' in code:
-                        product_name = "Medicare Advantage Plus Plan 2025"
-                        copay = 20.00
-                        deductible = 1000.00
-                        oop_max = 6000.00
-                        coinsurance = 15
-                    elif 'PREM' in code:
-                        product_name = "Medicare Advantage Premium Plan 2025"
-                        copay = 15.00
-                        deductible = 500.00
-                        oop_max = 4000.00
-                        coinsurance = 10
-                    else:
-                        product_name = "Medicare Advantage Standard Plan 2025"
-                        copay = 25.00
-                        deductible = 1500.00
-                        oop_max = 8000.00
-                        coinsurance = 20
-                    
-                    insert_query = """
-                        INSERT INTO product_catalog (
-                            product_code, product_name, product_type, category, 
-                            subcategory, network_type, copay_amount, deductible_amount,
-                            out_of_pocket_max, coinsurance_percentage, prescription_coverage,
-                            dental_coverage, vision_coverage, mental_health_coverage,
-                            effective_date, state_availability, age_restrictions
-                        ) VALUES (
-                            %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s
-                        )
-                    """
-                    
-                    insert_params = (
-                        code, product_name, 'Medicare Advantage', 'Medicare', 'Senior',
-                        'In-Network Only', copay, deductible, oop_max, coinsurance,
-                        True, True, True, True, '2025-01-01', 'All States', '65+'
-                    )
-                    
-                    insert_result = executor._run(query=insert_query, params=insert_params)
-                    if insert_result["status"] == "success":
-                        inserted_codes.append(code)
+            inserted_codes = [row[0] for row in inserted]
+            existing_codes = [code for code in product_codes if code not in inserted_codes]
+            missing_codes = inserted_codes
             
             return {
                 "status": "success",
@@ -296,11 +300,11 @@ class ProductCodeValidatorTool(BaseTool):
         if not product_codes:
             return {"status": "error", "message": "No product codes provided for validation"}
         
-        executor = QueryExecutorTool()
+        executor = _EXECUTOR
         placeholders = ', '.join(['%s'] * len(product_codes))
         query = f"SELECT product_code FROM product_catalog WHERE product_code IN ({placeholders})"
         
-        result = executor._run(query=query, params=tuple(product_codes))
+        result = executor.run_query(query=query, params=tuple(product_codes))
         
         if result["status"] == "success":
             found_codes = [row["product_code"] for row in result["data"]]
@@ -337,7 +341,7 @@ class BulkInsertTool(BaseTool):
         if not table_name:
             return {"status": "error", "message": "Table name is required"}
         
-        executor = QueryExecutorTool()
+        executor = _EXECUTOR
         
         # Build the INSERT query dynamically
         columns = list(data[0].keys())
@@ -351,7 +355,7 @@ class BulkInsertTool(BaseTool):
         
         for record in data:
             values = tuple(record[col] for col in columns)
-            result = executor._run(query=query, params=values)
+            result = executor.run_query(query=query, params=values)
             
             if result["status"] == "success":
                 success_count += 1
@@ -402,7 +406,7 @@ class TransactionManagerTool(BaseTool):
             self.transaction_log.append({
                 "query": query,
                 "params": params,
-                "timestamp": datetime.now().isoformat()
+                "ts_ns": time.time_ns()
             })
             
             if query.strip().upper().startswith('SELECT'):
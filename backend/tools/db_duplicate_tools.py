@@ -1,106 +1,229 @@
 
 from crewai.tools import BaseTool
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
+import re
+import threading
+from collections import OrderedDict
+from operator import itemgetter
 from pydantic import BaseModel, Field, ConfigDict
-from utils.helper import DatabaseConnection
+from psycopg2 import sql
+from psycopg2.extras import RealDictCursor
+from utils.db_pool import get_connection, release_connection
+from utils.prepared import execute_prepared
 
+# Ticket parsing pattern, compiled once at import. Table references
+# (tbl1, tbl2.col) and duplicate-field hints (f1, f2, f3) share one
+# alternation so the ticket is scanned in a single pass. Each branch is a
+# lookahead so one hint cannot consume text another hint needs
+# (e.g. "users table by email" yields both a table and the email field).
+# The tbl2 identifier is wrapped in the (?=(?P<x>...))(?P=x) idiom, an atomic
+# group that also works before Python 3.11, so a name not followed by "." fails
+# at once instead of backtracking through every shorter prefix.
+_TICKET_RE = re.compile(
+    r'(?=(?:table|from|into|update)\s+(?P<tbl1>[a-zA-Z_][a-zA-Z0-9_]*))'
+    r'|(?<![a-zA-Z0-9_.])(?=(?=(?P<tbl2>[a-zA-Z_][a-zA-Z0-9_]*))(?P=tbl2)\.(?P<col>[a-zA-Z_][a-zA-Z0-9_]*))'
+    r'|(?=(?:field|column)\s+(?P<f1>[a-zA-Z_][a-zA-Z0-9_]*))'
+    r'|(?=duplicate\s+on\s+(?P<f2>[a-zA-Z_][a-zA-Z0-9_]*))'
+    r'|(?=by\s+(?P<f3>[a-zA-Z_][a-zA-Z0-9_]*))',
+    re.IGNORECASE
+)
+
+# Every _TICKET_RE branch needs one of these (lowercase) substrings to match
+_TICKET_KEYWORDS = ("table", "from", "into", "update", "field", "column", "duplicate", "by", ".")
+_DEFAULT_TABLES = ("users", "products", "orders")
+_DEFAULT_FIELDS = ("email", "name", "id")
+
+# LRU memo of parsed tickets keyed by hash(ticket_content); entries keep the
+# content alongside the result so hash collisions are detected
+_PARSE_CACHE_SIZE = 256
+_PARSE_CACHE: "OrderedDict[int, tuple]" = OrderedDict()
+_PARSE_CACHE_LOCK = threading.Lock()
+
+
+# Allowlist of public tables and their columns (with SQL types), introspected on
+# first use and reloaded when a lookup misses, so tables or columns added later are found
+_ALLOWED_COLUMNS: Optional[Dict[str, Dict[str, str]]] = None
+
+def _allowed_columns(conn, refresh: bool = False) -> Dict[str, Dict[str, str]]:
+    """Return {table: {column: type}} for the public schema, loading it on first use or when refresh is set"""
+    global _ALLOWED_COLUMNS
+    if _ALLOWED_COLUMNS is None or refresh:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod)
+                FROM pg_attribute a
+                JOIN pg_class c ON c.oid = a.attrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = 'public'
+                AND c.relkind IN ('r', 'p', 'v', 'm', 'f')
+                AND a.attnum > 0 AND NOT a.attisdropped
+            """)
+            allowed = {}
+            for table, column, column_type in cursor.fetchall():
+                allowed.setdefault(table, {})[column] = column_type
+        _ALLOWED_COLUMNS = allowed
+    return _ALLOWED_COLUMNS
+
+def _check_identifiers(conn, table_name: str, fields: List[str]):
+    """Raise ValueError unless table_name and every field exist in the schema allowlist"""
+    columns = _allowed_columns(conn).get(table_name)
+    if columns is None or not all(field in columns for field in fields):
+        # Misses are never trusted from the cache: reload once before rejecting
+        columns = _allowed_columns(conn, refresh=True).get(table_name)
+    if columns is None:
+        raise ValueError(f"Unknown table '{table_name}'")
+    unknown = [field for field in fields if field not in columns]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table_name}: {unknown}")
+
+def _equality_predicate(fields: List[str], record: Dict[str, Any], numbered: bool = False):
+    """Build (where_clause, values) over the fields present in record; clause is None if none match"""
+    # Clause text depends only on the field set, so the same fields give identical SQL.
+    # numbered uses $1..$n placeholders, as required inside a PREPARE body
+    present = [field for field in fields if field in record]
+    if not present:
+        return None, []
+    where_clause = sql.SQL(" AND ").join(
+        sql.SQL("{} = ${}").format(sql.Identifier(field), sql.SQL(str(position)))
+        if numbered else sql.SQL("{} = %s").format(sql.Identifier(field))
+        for position, field in enumerate(present, 1)
+    )
+    return where_clause, [record[field] for field in present]
+
+def _top_duplicates_query(table_name: str, fields: List[str]) -> sql.Composed:
+    """Compose the query returning the top 10 duplicate groups plus window totals"""
+    # Totals ride along as window aggregates, computed over every group
+    # before LIMIT, so one round trip returns the top 10 and the totals
+    fields_sql = sql.SQL(', ').join(map(sql.Identifier, fields))
+    return sql.SQL("""
+        WITH dupes AS (
+            SELECT {fields}, COUNT(*) as duplicate_count
+            FROM {table}
+            GROUP BY {fields}
+            HAVING COUNT(*) > 1
+        )
+        SELECT *,
+               COUNT(*) OVER () AS group_count,
+               (SUM(duplicate_count) OVER ())::bigint AS total_count
+        FROM dupes
+        ORDER BY duplicate_count DESC
+        LIMIT 10
+    """).format(fields=fields_sql, table=sql.Identifier(table_name))
 
 class DBDuplicateCheckerTicketParserTool(BaseTool):
     name: str = "ticket_parser"
     description: str = "Parse ticket information to extract table names and duplicate criteria"
     
     class ArgsSchema(BaseModel):
-        ticket_content: Optional[str] = Field(None, description="Content of the ticket to parse")
+        ticket_content: str = Field(..., min_length=1, description="Content of the ticket to parse")
         
-        model_config = ConfigDict(extra='allow')  # Allow additional fields
+        model_config = ConfigDict(extra='forbid')
     
     args_schema: type = ArgsSchema
     
-    def _run(self, **kwargs) -> Dict[str, Any]:
+    def _run(self, ticket_content: str) -> Dict[str, Any]:
         """Parse ticket content to identify tables and duplicate detection criteria"""
-        ticket_content = kwargs.get('ticket_content')
-        if not ticket_content:
+        # Tickets with no SQL-ish keywords cannot match, so skip the regex pass
+        lowered = ticket_content.lower()
+        if not any(keyword in lowered for keyword in _TICKET_KEYWORDS):
             return {
-                "status": "error",
-                "message": "No ticket content provided for parsing"
+                "tables": list(_DEFAULT_TABLES),
+                "fields": list(_DEFAULT_FIELDS)
             }
         
-        import re
+        key = hash(ticket_content)
+        with _PARSE_CACHE_LOCK:
+            cached = _PARSE_CACHE.get(key)
+            if cached is not None and cached[0] == ticket_content:
+                _PARSE_CACHE.move_to_end(key)
+                tables, fields = cached[1]
+                return {"tables": list(tables), "fields": list(fields)}
         
         # Extract table names (looking for patterns like 'table_name', "table_name", or table references)
-        table_pattern = r'(?:table|from|into|update)\s+([a-zA-Z_][a-zA-Z0-9_]*)|([a-zA-Z_][a-zA-Z0-9_]*)\.([a-zA-Z_][a-zA-Z0-9_]*)'
-        tables = re.findall(table_pattern, ticket_content, re.IGNORECASE)
-        table_names = [t[0] or t[1] for t in tables if t[0] or t[1]]
+        # and field names for duplicate checking, bucketed by the group that matched
+        table_names, field_names = set(), set()
+        for match in _TICKET_RE.finditer(ticket_content):
+            group = match.lastgroup
+            if group == 'tbl1':
+                table_names.add(match.group('tbl1'))
+            elif group == 'col':
+                table_names.add(match.group('tbl2'))
+            else:
+                field_names.add(match.group(group))
+        
+        tables = tuple(table_names) or _DEFAULT_TABLES
+        fields = tuple(field_names) or _DEFAULT_FIELDS
         
-        # Extract field names for duplicate checking
-        field_pattern = r'(?:field|column)\s+([a-zA-Z_][a-zA-Z0-9_]*)|duplicate\s+on\s+([a-zA-Z_][a-zA-Z0-9_]*)|by\s+([a-zA-Z_][a-zA-Z0-9_]*)'
-        fields = re.findall(field_pattern, ticket_content, re.IGNORECASE)
-        field_names = [f[0] or f[1] or f[2] for f in fields if f[0] or f[1] or f[2]]
+        # The cache keeps immutable tuples; every call gets its own lists
+        with _PARSE_CACHE_LOCK:
+            _PARSE_CACHE[key] = (ticket_content, (tables, fields))
+            _PARSE_CACHE.move_to_end(key)
+            if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE:
+                _PARSE_CACHE.popitem(last=False)
         
-        return {
-            "tables": list(set(table_names)) if table_names else ["users", "products", "orders"],  # Default tables
-            "fields": list(set(field_names)) if field_names else ["email", "name", "id"],  # Default fields
-            "ticket_content": ticket_content
-        }
+        return {"tables": list(tables), "fields": list(fields)}
+
+class DuplicateDetectionTarget(BaseModel):
+    table_name: str = Field(..., min_length=1, description="Name of the table to check for duplicates")
+    fields: List[str] = Field(..., min_length=1, description="List of fields to check for duplicates")
+    
+    model_config = ConfigDict(extra='forbid')
 
 class DBDuplicateCheckerDuplicateDetectorTool(BaseTool):
     name: str = "duplicate_detector"
     description: str = "Detect duplicate records in database tables"
     
     class ArgsSchema(BaseModel):
-        table_name: Optional[str] = Field(None, description="Name of the table to check for duplicates")
-        fields: Optional[List[str]] = Field(None, description="List of fields to check for duplicates")
+        table_name: Optional[str] = Field(None, min_length=1, description="Name of the table to check for duplicates")
+        fields: Optional[List[str]] = Field(None, min_length=1, description="List of fields to check for duplicates")
+        tables_and_fields: Optional[List[DuplicateDetectionTarget]] = Field(
+            None, min_length=1,
+            description="Several tables to check in one call, each with its own fields; use instead of table_name/fields"
+        )
         
-        model_config = ConfigDict(extra='allow')  # Allow additional fields
-
-    def __init__(self):
-        super().__init__()
-        self.db = DatabaseConnection()
+        model_config = ConfigDict(extra='forbid')
+    
+    args_schema: type = ArgsSchema
 
-    def _run(self, **kwargs) -> Dict[str, Any]:
-        """Find duplicate records in specified table and fields"""
-        table_name = kwargs.get('table_name')
-        fields = kwargs.get('fields')
-        
+    def _run(self, table_name: Optional[str] = None, fields: Optional[List[str]] = None,
+             tables_and_fields: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Find duplicate records in specified table and fields, or in several tables at once"""
+        if tables_and_fields:
+            # Entries arrive as DuplicateDetectionTarget models or as their dumped dicts
+            pairs = [
+                (entry["table_name"], entry["fields"]) if isinstance(entry, dict) else (entry.table_name, entry.fields)
+                for entry in tables_and_fields
+            ]
+            return self._run_batch(pairs)
         if not table_name or not fields:
             return {
                 "status": "error",
-                "message": "Both table_name and fields are required for duplicate detection"
+                "message": "Either table_name and fields, or tables_and_fields, is required for duplicate detection"
             }
         
+        conn = None
         try:
-            conn = self.db.get_connection()
+            conn = get_connection()
+            _check_identifiers(conn, table_name, fields)
             cursor = conn.cursor()
             
-            # Build query to find duplicates
-            fields_str = ', '.join(fields)
-            query = f"""
-                SELECT {fields_str}, COUNT(*) as duplicate_count
-                FROM {table_name}
-                GROUP BY {fields_str}
-                HAVING COUNT(*) > 1
-                ORDER BY duplicate_count DESC
-                LIMIT 100
-            """
-            
-            cursor.execute(query)
+            cursor.execute(_top_duplicates_query(table_name, fields))
             duplicates = cursor.fetchall()
             
-            # Convert to list of dictionaries
-            duplicate_list = []
-            for row in duplicates:
-                row_dict = {}
-                for i, field in enumerate(fields):
-                    row_dict[field] = row[i]
-                row_dict['duplicate_count'] = row[-1]  # Last column is count
-                duplicate_list.append(row_dict)
+            n_fields = len(fields)
+            if duplicates:
+                total_duplicate_groups, total_duplicate_records = duplicates[0][n_fields + 1:]
+            else:
+                total_duplicate_groups, total_duplicate_records = 0, 0
             
-            total_duplicate_groups = len(duplicate_list)
-            total_duplicate_records = sum(d["duplicate_count"] for d in duplicate_list)
+            # Convert to list of dictionaries (field values, then count)
+            duplicate_list = [
+                dict(zip(fields, row[:n_fields]), duplicate_count=row[n_fields])
+                for row in duplicates
+            ]
             
             cursor.close()
-            conn.close()
             
             return {
                 "status": "success",
@@ -108,7 +231,7 @@ class DBDuplicateCheckerDuplicateDetectorTool(BaseTool):
                 "fields": fields,
                 "duplicate_groups": total_duplicate_groups,
                 "total_duplicates": total_duplicate_records,
-                "details": duplicate_list[:10]  # Top 10 duplicate groups
+                "details": duplicate_list  # Top 10 duplicate groups
             }
                 
         except Exception as e:
@@ -116,99 +239,152 @@ class DBDuplicateCheckerDuplicateDetectorTool(BaseTool):
                 "status": "error",
                 "message": f"Error detecting duplicates in {table_name}: {str(e)}"
             }
+        finally:
+            if conn:
+                release_connection(conn)
+
+    def _run_batch(self, tables_and_fields: List[Tuple[str, List[str]]]) -> Dict[str, Any]:
+        """Find duplicate records across several tables in a single round trip"""
+        if not tables_and_fields:
+            return {
+                "status": "error",
+                "message": "At least one (table_name, fields) pair is required for duplicate detection"
+            }
+        
+        conn = None
+        try:
+            conn = get_connection()
+            for table_name, fields in tables_and_fields:
+                _check_identifiers(conn, table_name, fields)
+            cursor = conn.cursor()
+            
+            # Each table's top-10 query becomes one UNION ALL branch. Every
+            # (table, field) pair gets its own slot column, filled only by its
+            # table's branch, so group keys keep their column types
+            offsets, fillers = [], []
+            allowed = _allowed_columns(conn)
+            for table_name, fields in tables_and_fields:
+                offsets.append(len(fillers))
+                # Postgres resolves UNION ALL column types one pair of branches at a
+                # time, so an untyped NULL in the first two branches settles as text
+                # and a later integer/date slot fails to match; cast every filler
+                # to its column's real type instead
+                fillers.extend(
+                    sql.SQL("CAST(NULL AS {})").format(sql.SQL(allowed[table_name][field]))
+                    for field in fields
+                )
+            branches = []
+            for index, (table_name, fields) in enumerate(tables_and_fields):
+                slots = list(fillers)
+                slots[offsets[index]:offsets[index] + len(fields)] = [
+                    sql.SQL("t.{}").format(sql.Identifier(field)) for field in fields
+                ]
+                branches.append(sql.SQL("""
+                    SELECT {label} AS target, t.duplicate_count, t.group_count, t.total_count, {slots}
+                    FROM ({query}) t
+                """).format(
+                    label=sql.Literal(index),
+                    slots=sql.SQL(', ').join(slots),
+                    query=_top_duplicates_query(table_name, fields)
+                ))
+            cursor.execute(sql.SQL(" UNION ALL ").join(branches))
+            rows = cursor.fetchall()
+            cursor.close()
+            
+            results = [
+                {
+                    "table": table_name,
+                    "fields": fields,
+                    "duplicate_groups": 0,
+                    "total_duplicates": 0,
+                    "details": []
+                }
+                for table_name, fields in tables_and_fields
+            ]
+            for index, duplicate_count, group_count, total_count, *slots in rows:
+                result = results[index]
+                result["duplicate_groups"] = group_count
+                result["total_duplicates"] = total_count
+                start = offsets[index]
+                key = slots[start:start + len(result["fields"])]
+                result["details"].append(dict(zip(result["fields"], key), duplicate_count=duplicate_count))
+            for result in results:
+                result["details"].sort(key=itemgetter("duplicate_count"), reverse=True)
+            
+            return {
+                "status": "success",
+                "results": results
+            }
+                
+        except Exception as e:
+            return {
+                "status": "error",
+                "message": f"Error detecting duplicates in batch: {str(e)}"
+            }
+        finally:
+            if conn:
+                release_connection(conn)
 
 class DBDuplicateQueryExecutor(BaseTool):
     name: str = "duplicate_query_executor"
     description: str = "Execute queries to delete duplicate records based on specific criteria"
     
     class ArgsSchema(BaseModel):
-        table_name: Optional[str] = Field(None, description="Name of the table to delete duplicates from")
-        fields: Optional[List[str]] = Field(None, description="List of fields to identify duplicates")
-        record_to_keep: Optional[Dict[str, Any]] = Field(None, description="Record to keep (will not be deleted)")
-        record_to_delete: Optional[Dict[str, Any]] = Field(None, description="Record to delete")
+        table_name: str = Field(..., min_length=1, description="Name of the table to delete duplicates from")
+        fields: List[str] = Field(..., min_length=1, description="List of fields to identify duplicates")
+        record_to_keep: Dict[str, Any] = Field(..., min_length=1, description="Record to keep (will not be deleted)")
+        record_to_delete: Dict[str, Any] = Field(..., min_length=1, description="Record to delete")
         
-        model_config = ConfigDict(extra='allow')  # Allow additional fields
-
-    def __init__(self):
-        super().__init__()
-        self.db = DatabaseConnection()
+        model_config = ConfigDict(extra='forbid')
     
-    def _run(self, **kwargs) -> Dict[str, Any]:
+    args_schema: type = ArgsSchema
+    
+    def _run(self, table_name: str, fields: List[str], record_to_keep: Dict[str, Any], record_to_delete: Dict[str, Any]) -> Dict[str, Any]:
         """Delete duplicate records based on specific field criteria and record details"""
-        table_name = kwargs.get('table_name')
-        fields = kwargs.get('fields')
-        record_to_keep = kwargs.get('record_to_keep')
-        record_to_delete = kwargs.get('record_to_delete')
-        
-        if not table_name or not fields or not record_to_keep or not record_to_delete:
-            return {
-                "status": "error",
-                "message": "All parameters (table_name, fields, record_to_keep, record_to_delete) are required"
-            }
-        
+        conn = None
         try:
-            from psycopg2.extras import RealDictCursor
-
-            conn = self.db.get_connection()
+            conn = get_connection()
+            _check_identifiers(conn, table_name, fields)
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             
             # Build WHERE clause for the record to delete
-            where_conditions = []
-            for field in fields:
-                if field in record_to_delete:
-                    where_conditions.append(f"{field} = %s")
+            where_clause, delete_values = _equality_predicate(fields, record_to_delete)
             
-            if not where_conditions:
+            if not where_clause:
                 cursor.close()
-                conn.close()
                 return {
                     "status": "error",
                     "message": "No valid fields provided for deletion criteria"
                 }
             
-            where_clause = " AND ".join(where_conditions)
+            # Delete the record directly; the DELETE's rowcount tells us whether
+            # anything matched, so no separate existence check is needed
+            delete_query = sql.SQL("""
+                DELETE FROM {table}
+                WHERE {where}
+            """).format(table=sql.Identifier(table_name), where=where_clause)
             
-            # First, verify the record exists and get its ID
-            select_query = f"""
-                SELECT * FROM {table_name}
-                WHERE {where_clause}
-                LIMIT 1
-            """
-            
-            # Execute select query with parameters
-            select_values = [record_to_delete[field] for field in fields if field in record_to_delete]
-            cursor.execute(select_query, select_values)
-            select_result = cursor.fetchall()
+            # Execute delete query with parameters
+            cursor.execute(delete_query, delete_values)
+            affected_rows = cursor.rowcount
             
-            if not select_result:
+            if affected_rows == 0:
                 cursor.close()
-                conn.close()
                 return {
                     "status": "error",
                     "message": f"Record not found in {table_name} with the specified criteria"
                 }
             
-            # Build DELETE query
-            delete_query = f"""
-                DELETE FROM {table_name}
-                WHERE {where_clause}
-            """
-            
-            # Execute delete query with parameters
-            cursor.execute(delete_query, select_values)
-            affected_rows = cursor.rowcount
-            
             # Commit the transaction
             conn.commit()
             
             cursor.close()
-            conn.close()
             
             return {
                 "status": "success",
                 "message": f"Successfully deleted duplicate record from {table_name}",
                 "table": table_name,
-                "deleted_criteria": where_clause,
+                "deleted_criteria": where_clause.as_string(conn),
                 "affected_rows": affected_rows
             }
                 
@@ -217,89 +393,88 @@ class DBDuplicateQueryExecutor(BaseTool):
                 "status": "error",
                 "message": f"Error executing duplicate deletion query: {str(e)}"
             }
+        finally:
+            if conn:
+                release_connection(conn)
     
     def delete_duplicates_by_criteria(self, table_name: str, fields: List[str], duplicate_criteria: Dict[str, Any]) -> Dict[str, Any]:
         """Delete all duplicate records that match specific criteria"""
+        conn = None
         try:
-            from psycopg2.extras import RealDictCursor
-
-            conn = self.db.get_connection()
+            conn = get_connection()
+            _check_identifiers(conn, table_name, fields)
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             
             # Build WHERE clause for duplicate criteria
-            where_conditions = []
-            for field in fields:
-                if field in duplicate_criteria:
-                    where_conditions.append(f"{field} = %s")
+            where_clause, criteria_values = _equality_predicate(fields, duplicate_criteria)
             
-            if not where_conditions:
+            if not where_clause:
                 cursor.close()
-                conn.close()
                 return {
                     "status": "error",
                     "message": "No valid fields provided for deletion criteria"
                 }
             
-            where_clause = " AND ".join(where_conditions)
-            
-            # Count records before deletion
-            count_query = f"""
-                SELECT COUNT(*) as count
-                FROM {table_name}
-                WHERE {where_clause}
-            """
-            
-            # Execute count query with parameters
-            count_values = [duplicate_criteria[field] for field in fields if field in duplicate_criteria]
-            cursor.execute(count_query, count_values)
-            count_result = cursor.fetchone()
+            # Delete all but one record (keep the first one). Matching rows are
+            # scanned once and addressed by ctid, so no id column is required;
+            # the same statement reports how many matched and how many went
+            def delete_query():
+                return sql.SQL("""
+                    WITH dupes AS (
+                        SELECT ctid FROM {table}
+                        WHERE {where}
+                    ),
+                    keep AS (
+                        SELECT ctid FROM dupes LIMIT 1
+                    ),
+                    deleted AS (
+                        DELETE FROM {table}
+                        WHERE ctid IN (SELECT ctid FROM dupes)
+                        AND ctid NOT IN (SELECT ctid FROM keep)
+                        RETURNING 1
+                    )
+                    SELECT (SELECT COUNT(*) FROM dupes) AS total,
+                           (SELECT COUNT(*) FROM deleted) AS deleted
+                """).format(
+                    table=sql.Identifier(table_name),
+                    where=_equality_predicate(fields, duplicate_criteria, numbered=True)[0]
+                )
             
-            record_count = count_result['count'] if count_result else 0
+            # This runs once per duplicate group, so the statement is prepared
+            # once per (table, criteria fields) shape and its plan reused
+            shape = ("delete_duplicates", table_name, tuple(field for field in fields if field in duplicate_criteria))
+            execute_prepared(cursor, shape, delete_query, criteria_values)
+            counts = cursor.fetchone()
+            record_count, deleted_count = counts['total'], counts['deleted']
             
             if record_count <= 1:
                 cursor.close()
-                conn.close()
                 return {
                     "status": "info",
                     "message": f"No duplicate records found in {table_name} with the specified criteria",
                     "table": table_name,
-                    "criteria": where_clause
+                    "criteria": where_clause.as_string(conn)
                 }
             
-            # Delete all but one record (keep the first one)
-            delete_query = f"""
-                DELETE FROM {table_name}
-                WHERE {where_clause}
-                AND id NOT IN (
-                    SELECT id FROM (
-                        SELECT id FROM {table_name}
-                        WHERE {where_clause}
-                        LIMIT 1
-                    ) AS keep_record
-                )
-            """
-            
-            # Execute delete query with parameters
-            cursor.execute(delete_query, count_values)
-            deleted_count = cursor.rowcount
-            
             # Commit the transaction
             conn.commit()
             
             cursor.close()
-            conn.close()
             
             return {
                 "status": "success",
                 "message": f"Successfully deleted {deleted_count} duplicate records from {table_name}",
                 "table": table_name,
-                "deleted_criteria": where_clause,
+                "deleted_criteria": where_clause.as_string(conn),
                 "records_deleted": deleted_count,
-                "records_kept": 1
+                "records_kept": record_count - deleted_count
             }
                 
         except Exception as e:
             return {
                 "status": "error",
                 "message": f"Error executing bulk duplicate deletion: {str(e)}"
-            }
\ No newline at end of file
+            }
+        finally:
+            if conn:
+                release_connection(conn)
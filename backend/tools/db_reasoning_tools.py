@@ -1,242 +1,416 @@
 import os
-import psycopg2
-import json
+import io
+import csv
+import threading
+import time
+from functools import lru_cache
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+import orjson
 from typing import Dict, Any, List
 from crewai.tools import BaseTool 
 from crewai_tools import NL2SQLTool
 from pydantic import BaseModel, Field
 import logging
+from utils.db_pool import get_connection, release_connection
+from utils.prepared import execute_prepared
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+_MEMBER_COLUMNS = (
+    "member_id", "first_name", "last_name", "date_of_birth", "enrollment_date",
+    "plan_code", "product_code", "status", "primary_care_provider_id",
+    "coverage_effective_date", "coverage_termination_date",
+)
+_MEMBER_INSERT = (
+    f"INSERT INTO member_enrollment ({', '.join(_MEMBER_COLUMNS)}) VALUES {{values}} "
+    "RETURNING member_id, first_name, last_name"
+)
+_MEMBER_COPY = f"COPY member_enrollment ({', '.join(_MEMBER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+_PROVIDER_COLUMNS = (
+    "provider_id", "npi_number", "provider_name", "provider_type", "specialty",
+    "product_code", "network_tier", "address_line1", "city", "state", "zip_code",
+    "phone_number", "email", "languages_spoken", "accepting_new_patients",
+    "quality_rating", "patient_volume",
+)
+_PROVIDER_INSERT = (
+    f"INSERT INTO provider_network ({', '.join(_PROVIDER_COLUMNS)}) VALUES {{values}} "
+    "RETURNING provider_id, provider_name"
+)
+_PROVIDER_COPY = f"COPY provider_network ({', '.join(_PROVIDER_COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+
+# Batches larger than this are streamed with COPY instead of a multi-row INSERT
+_COPY_THRESHOLD = 500
+
+# Member enrollments ranked within each (first_name, last_name, date_of_birth)
+# group, earliest enrollment first; shared by duplicate detection and cleanup
+_RANKED_MEMBERS_CTE = """
+WITH ranked AS (
+    SELECT member_id, first_name, last_name, date_of_birth, enrollment_date,
+           ROW_NUMBER() OVER (PARTITION BY first_name, last_name, date_of_birth
+                              ORDER BY enrollment_date, member_id) AS rn,
+           COUNT(*) OVER (PARTITION BY first_name, last_name, date_of_birth) AS group_size
+    FROM member_enrollment
+)
+"""
+
+# (report label, scalar count query) for each data validation check
+_VALIDATION_CHECKS = (
+    ("Members with invalid product codes", """
+        SELECT COUNT(*) FROM member_enrollment me 
+        LEFT JOIN product_catalog pc ON me.product_code = pc.product_code 
+        WHERE pc.product_code IS NULL
+    """),
+    ("Providers with invalid product codes", """
+        SELECT COUNT(*) FROM provider_network pn 
+        LEFT JOIN product_catalog pc ON pn.product_code = pc.product_code 
+        WHERE pc.product_code IS NULL
+    """),
+    ("Remaining duplicate member groups", """
+        SELECT COUNT(*) FROM (
+            SELECT first_name, last_name, date_of_birth
+            FROM member_enrollment 
+            GROUP BY first_name, last_name, date_of_birth
+            HAVING COUNT(*) > 1
+        ) duplicates
+    """),
+    ("Total member records", "SELECT COUNT(*) FROM member_enrollment"),
+    ("Total provider records", "SELECT COUNT(*) FROM provider_network"),
+)
+
+# Every check as a scalar subquery, so one round trip returns all counts in one row
+_VALIDATION_QUERY = "SELECT " + ", ".join(f"({query})" for _, query in _VALIDATION_CHECKS)
+
+# Insert plan per (database, table) built from information_schema, reused for _SCHEMA_TTL seconds
+_SCHEMA_TTL = 300.0
+_SCHEMA_CACHE: Dict[tuple, tuple] = {}
+_SCHEMA_LOCK = threading.Lock()
+
+# Marks a missing value whose column should be left to its database default
+_DB_DEFAULT = object()
+
+# (data_type substring, fallback) for missing NOT NULL columns, first match wins
+_TYPE_DEFAULTS = (
+    ('date', '1900-01-01'),
+    ('varchar', 'Unknown'),
+    ('text', 'Unknown'),
+    ('int', 0),
+    ('decimal', 0),
+    ('numeric', 0),
+    ('boolean', False),
+)
+
+def _missing_value(data_type: str, is_nullable: str, column_default: Any) -> Any:
+    """Choose what a column gets when the payload omits it"""
+    if column_default is not None:
+        return _DB_DEFAULT
+    if is_nullable == 'YES':
+        return None
+    data_type = data_type.lower()
+    return next((fallback for key, fallback in _TYPE_DEFAULTS if key in data_type), 'Unknown')
+
+def _column_plan(cursor, table_name: str) -> tuple:
+    """Return ([(column_name, missing_value), ...], primary_key_columns) for table_name, cached with a TTL"""
+    key = (cursor.connection.info.dbname, table_name)
+    now = time.monotonic()
+    with _SCHEMA_LOCK:
+        cached = _SCHEMA_CACHE.get(key)
+    if cached and now - cached[0] < _SCHEMA_TTL:
+        return cached[1]
+    
+    cursor.execute("""
+        SELECT c.column_name, c.data_type, c.is_nullable, c.column_default,
+               EXISTS (
+                   SELECT 1
+                   FROM information_schema.key_column_usage k
+                   JOIN information_schema.table_constraints t USING (constraint_schema, constraint_name)
+                   WHERE t.constraint_type = 'PRIMARY KEY'
+                   AND k.table_schema = c.table_schema
+                   AND k.table_name = c.table_name
+                   AND k.column_name = c.column_name
+               ) AS is_primary_key
+        FROM information_schema.columns c
+        WHERE c.table_name = %s 
+        ORDER BY c.ordinal_position
+    """, (table_name,))
+    columns_info = cursor.fetchall()
+    if not columns_info:
+        # Unknown tables are not cached so a table created later is seen at once
+        return None
+    
+    # Auto-generated timestamp columns are never written
+    plan = [
+        (col_name, _missing_value(data_type, is_nullable, column_default))
+        for col_name, data_type, is_nullable, column_default, _ in columns_info
+        if col_name not in ('created_at', 'updated_at')
+    ]
+    primary_key = tuple(row[0] for row in columns_info if row[4])
+    with _SCHEMA_LOCK:
+        _SCHEMA_CACHE[key] = (now, (plan, primary_key))
+    return plan, primary_key
+
+@lru_cache(maxsize=256)
+def _insert_statement(table_name: str, columns: tuple, returning: tuple) -> sql.Composed:
+    """Compose INSERT ... RETURNING returning (all columns for "*", none if empty) with safely quoted identifiers"""
+    statement = sql.SQL("INSERT INTO {table} ({columns}) VALUES ({values})").format(
+        table=sql.Identifier(table_name),
+        columns=sql.SQL(', ').join(map(sql.Identifier, columns)),
+        values=sql.SQL(', ').join(sql.Placeholder() * len(columns))
+    )
+    if returning == ('*',):
+        return statement + sql.SQL(" RETURNING *")
+    if returning:
+        return statement + sql.SQL(" RETURNING {}").format(sql.SQL(', ').join(map(sql.Identifier, returning)))
+    return statement
+
+def _copy_rows(cursor, copy_statement: str, rows: List[tuple]):
+    """Stream rows into a table with COPY ... FROM STDIN in CSV format (None becomes NULL)"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(copy_statement, buffer)
+
+def _insert_rows(cursor, name: str, insert_template: str, rows: List[tuple]) -> List[tuple]:
+    """Insert rows and return the RETURNING results, reusing a prepared plan for single rows"""
+    # A multi-row VALUES list has no fixed shape to prepare, so only the
+    # common one-record call goes through EXECUTE; batches use execute_values
+    if len(rows) == 1:
+        width = len(rows[0])
+        numbered = ", ".join(f"${position}" for position in range(1, width + 1))
+        execute_prepared(cursor, name, insert_template.format(values=f"({numbered})"), rows[0])
+        return cursor.fetchall()
+    return execute_values(cursor, insert_template.format(values="%s"), rows, page_size=500, fetch=True)
+
+@lru_cache(maxsize=1)
+def _conn_params() -> Dict[str, Any]:
+    """Connection parameters for these tools, read from the environment on first use"""
+    return {
+        'host': os.getenv('DB_HOST', 'localhost'),
+        'database': os.getenv('DB_NAME', 'testdb'),
+        'user': os.getenv('DB_USER', 'testuser'),
+        'password': os.getenv('DB_PASSWORD', 'testpass'),
+        'port': os.getenv('DB_PORT', '5432')
+    }
+
 class DatabaseConnectionTool(BaseTool):
     """Base tool for database connections"""
     
     def get_db_connection(self):
-        """Get database connection using environment variables"""
+        """Borrow a pooled database connection configured from environment variables"""
         try:
-            connection = psycopg2.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                database=os.getenv('DB_NAME', 'testdb'),
-                user=os.getenv('DB_USER', 'testuser'),
-                password=os.getenv('DB_PASSWORD', 'testpass'),
-                port=os.getenv('DB_PORT', '5432')
-            )
-            return connection
+            return get_connection(_conn_params())
         except Exception as e:
-            logger.error(f"Database connection failed: {e}")
+            logger.error("Database connection failed: %s", e)
             raise
+    
+    def release_db_connection(self, conn):
+        """Return a borrowed connection to the pool (never close it)"""
+        release_connection(conn, _conn_params())
+
+# (aliases, default) per column, in insert order after the key and name columns.
+# The first alias holding a value other than None or "" wins, so explicit
+# False/0 values (e.g. accepting_new_patients) are kept
+_MEMBER_FIELDS = (
+    (('date_of_birth', 'dob'), '1900-01-01'),
+    (('enrollment_date', 'enrollment_period'), '2025-01-01'),
+    (('plan_code', 'plan'), 'DEFAULT'),
+    (('product_code', 'product_id'), 'PROD_HMO_001'),
+    (('status',), 'ACTIVE'),
+    (('primary_care_provider_id', 'provider_id'), None),
+)
+
+_PROVIDER_FIELDS = (
+    (('npi_number', 'npi'), '0000000000'),
+    (('provider_name', 'name'), 'Unknown Provider'),
+    (('provider_type', 'type'), 'Primary Care'),
+    (('specialty', 'specialization'), 'General'),
+    (('product_code', 'product_id'), 'PROD_HMO_001'),
+    (('network_tier', 'tier'), 'Tier 2'),
+    (('address_line1', 'address'), None),
+    (('city',), None),
+    (('state',), None),
+    (('zip_code', 'zip'), None),
+    (('phone_number', 'phone'), None),
+    (('email',), None),
+    (('languages_spoken', 'languages'), 'English'),
+    (('accepting_new_patients',), True),
+    (('quality_rating',), 4.0),
+    (('patient_volume',), 1000),
+)
+
+def _pick(info: Dict[str, Any], aliases: tuple, default: Any) -> Any:
+    """Return the first alias value in info that is not None or "", else default"""
+    for alias in aliases:
+        value = info.get(alias)
+        if value is not None and value != "":
+            return value
+    return default
+
+def _unwrap_member_data(member_info: Any) -> Any:
+    """Return the payload nested as {"member_data": ...}, parsing it only if it is still a JSON string"""
+    if not isinstance(member_info, dict) or 'member_data' not in member_info:
+        return member_info
+    nested = member_info['member_data']
+    if isinstance(nested, (dict, list)):
+        return nested
+    if isinstance(nested, (str, bytes)):
+        return orjson.loads(nested)
+    raise TypeError(f"member_data must be a JSON string, object or list, not {type(nested).__name__}")
+
+def _member_row(member_info: Dict[str, Any]) -> tuple:
+    """Map one member JSON object onto member_enrollment columns, applying defaults"""
+    # Only member_id is truly required, everything else can have defaults
+    member_id = member_info.get('member_id')
+    if not member_id:
+        raise ValueError("member_id is required and cannot be empty")
+    
+    # Handle name parsing - split full name into first and last
+    name_parts = (member_info.get('name') or '').split()
+    if name_parts:
+        first_name = name_parts[0]
+        last_name = ' '.join(name_parts[1:]) or 'Unknown'
+    else:
+        first_name = _pick(member_info, ('first_name',), 'Unknown')
+        last_name = _pick(member_info, ('last_name',), 'Unknown')
+    
+    date_of_birth, enrollment_date, *rest = (
+        _pick(member_info, aliases, default) for aliases, default in _MEMBER_FIELDS
+    )
+    
+    # Coverage starts at enrollment unless stated otherwise
+    coverage_effective_date = _pick(member_info, ('coverage_effective_date',), enrollment_date)
+    coverage_termination_date = member_info.get('coverage_termination_date')
+    
+    return (
+        member_id, first_name, last_name, date_of_birth, enrollment_date, *rest,
+        coverage_effective_date, coverage_termination_date
+    )
+
+def _provider_row(provider_info: Dict[str, Any]) -> tuple:
+    """Map one provider JSON object onto provider_network columns, applying defaults"""
+    # Only provider_id is truly required
+    provider_id = provider_info.get('provider_id')
+    if not provider_id:
+        raise ValueError("provider_id is required and cannot be empty")
+    
+    return (provider_id, *(
+        _pick(provider_info, aliases, default) for aliases, default in _PROVIDER_FIELDS
+    ))
 
 class MemberInsertionTool(DatabaseConnectionTool):
     name: str = "member_insertion_tool"
-    description: str = "Insert new member enrollment records into the database. Only member_id is required; all other fields have intelligent defaults. Expects JSON with member_id, name/first_name/last_name, enrollment_period, product_id, provider_id, etc."
+    description: str = "Insert new member enrollment records into the database. Only member_id is required; all other fields have intelligent defaults. Expects JSON (one object or a list of objects) with member_id, name/first_name/last_name, enrollment_period, product_id, provider_id, etc."
     
     def _run(self, member_data: str) -> str:
         """
         Insert new member enrollment records
         Args:
-            member_data: JSON string containing member information for insertion
+            member_data: JSON string containing one member object or a list of them
         Returns:
             String result of the insertion operation
         """
+        conn = cursor = None
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
             # Parse the JSON string to extract member data
             try:
-                member_info = json.loads(member_data)
-            except json.JSONDecodeError as e:
+                member_info = orjson.loads(member_data)
+            except orjson.JSONDecodeError as e:
                 return f"Error parsing JSON data: {e}"
             
-            # Extract values from the parsed JSON
             # Handle both direct member_data and nested member_data structures
-            if 'member_data' in member_info:
-                # If the JSON has a nested structure like {"member_data": "..."}
-                try:
-                    member_info = json.loads(member_info['member_data'])
-                except (json.JSONDecodeError, TypeError):
-                    return "Error parsing nested member_data JSON"
-            
-            # Map the JSON fields to database columns with intelligent defaults
-            # Only member_id is truly required, everything else can have defaults
-            member_id = member_info.get('member_id')
-            if not member_id:
-                return "Error: member_id is required and cannot be empty"
-            
-            # Handle name parsing - split full name into first and last
-            full_name = member_info.get('name', '')
-            if full_name:
-                name_parts = full_name.strip().split()
-                if len(name_parts) == 1:
-                    first_name = name_parts[0]
-                    last_name = 'Unknown'
-                elif len(name_parts) >= 2:
-                    first_name = name_parts[0]
-                    last_name = ' '.join(name_parts[1:])
-                else:
-                    first_name = 'Unknown'
-                    last_name = 'Unknown'
-            else:
-                first_name = member_info.get('first_name', 'Unknown')
-                last_name = member_info.get('last_name', 'Unknown')
-            
-            # Handle dates with fallbacks
-            date_of_birth = member_info.get('date_of_birth')
-            if not date_of_birth:
-                date_of_birth = member_info.get('dob') or '1900-01-01'
-            
-            enrollment_date = member_info.get('enrollment_date') or member_info.get('enrollment_period') or '2025-01-01'
-            
-            # Handle plan and product codes
-            plan_code = member_info.get('plan_code') or member_info.get('plan') or 'DEFAULT'
-            product_code = member_info.get('product_code') or member_info.get('product_id') or 'PROD_HMO_001'
-            
-            # Status and provider
-            status = member_info.get('status', 'ACTIVE')
-            primary_care_provider_id = member_info.get('primary_care_provider_id') or member_info.get('provider_id')
-            
-            # Coverage dates
-            coverage_effective_date = member_info.get('coverage_effective_date') or enrollment_date
-            coverage_termination_date = member_info.get('coverage_termination_date')
-            
-            # Query to insert a new member
-            insert_query = """
-            INSERT INTO member_enrollment (
-                member_id, first_name, last_name, date_of_birth, enrollment_date,
-                plan_code, product_code, status, primary_care_provider_id,
-                coverage_effective_date, coverage_termination_date
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING member_id, first_name, last_name;
-            """
-            
-            # Execute the prepared statement with the extracted values
-            cursor.execute(insert_query, (
-                member_id, first_name, last_name, date_of_birth, enrollment_date,
-                plan_code, product_code, status, primary_care_provider_id,
-                coverage_effective_date, coverage_termination_date
-            ))
+            try:
+                member_info = _unwrap_member_data(member_info)
+            except (orjson.JSONDecodeError, TypeError):
+                return "Error parsing nested member_data JSON"
             
-            if cursor.description:
-                results = cursor.fetchall()
-                conn.commit()
-                return f"Successfully inserted member record: {results}"
-            else:
+            # Apply the defaults per record, then send every row in one statement
+            records = member_info if isinstance(member_info, list) else [member_info]
+            try:
+                rows = [_member_row(record) for record in records]
+            except ValueError as e:
+                return f"Error: {e}"
+            if not rows:
+                return "Error: no member records provided"
+            
+            # COPY cannot return rows, so large loads report a count instead
+            if len(rows) > _COPY_THRESHOLD:
+                _copy_rows(cursor, _MEMBER_COPY, rows)
                 conn.commit()
-                return "Member insertion completed successfully"
+                return f"Successfully inserted {len(rows)} member records"
+            
+            results = _insert_rows(cursor, "member_ins", _MEMBER_INSERT, rows)
+            conn.commit()
+            return f"Successfully inserted member record: {results}"
                 
         except Exception as e:
             if conn:
                 conn.rollback()
-            logger.error(f"Member insertion failed: {e}")
+            logger.error("Member insertion failed: %s", e)
             return f"Error inserting member records: {e}"
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
+                self.release_db_connection(conn)
 
 class ProviderInsertionTool(DatabaseConnectionTool):
     name: str = "provider_insertion_tool"
-    description: str = "Insert new provider records into the provider network. Only provider_id is required; all other fields have intelligent defaults. Expects JSON with provider_id, name, specialty, product_code, etc."
+    description: str = "Insert new provider records into the provider network. Only provider_id is required; all other fields have intelligent defaults. Expects JSON (one object or a list of objects) with provider_id, name, specialty, product_code, etc."
     
     def _run(self, provider_data: str) -> str:
         """
         Insert new provider records
         Args:
-            provider_data: JSON string containing provider information for insertion
+            provider_data: JSON string containing one provider object or a list of them
         Returns:
             String result of the insertion operation
         """
+        conn = cursor = None
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
             # Parse the JSON string to extract provider data
             try:
-                provider_info = json.loads(provider_data)
-            except json.JSONDecodeError as e:
+                provider_info = orjson.loads(provider_data)
+            except orjson.JSONDecodeError as e:
                 return f"Error parsing JSON data: {e}"
             
-            # Extract values from the parsed JSON with intelligent defaults
-            # Only provider_id is truly required
-            provider_id = provider_info.get('provider_id')
-            if not provider_id:
-                return "Error: provider_id is required and cannot be empty"
-            
-            # Handle provider name with fallbacks
-            provider_name = provider_info.get('provider_name') or provider_info.get('name', 'Unknown Provider')
-            
-            # Handle specialty with fallbacks
-            specialty = provider_info.get('specialty') or provider_info.get('specialization', 'General')
-            
-            # Handle product code with fallbacks
-            product_code = provider_info.get('product_code') or provider_info.get('product_id', 'PROD_HMO_001')
-            
-            # Handle provider type
-            provider_type = provider_info.get('provider_type') or provider_info.get('type', 'Primary Care')
-            
-            # Handle NPI number
-            npi_number = provider_info.get('npi_number') or provider_info.get('npi', '0000000000')
-            
-            # Handle network tier
-            network_tier = provider_info.get('network_tier') or provider_info.get('tier', 'Tier 2')
-            
-            # Handle contact information
-            phone_number = provider_info.get('phone_number') or provider_info.get('phone')
-            email = provider_info.get('email')
-            
-            # Handle address information
-            address_line1 = provider_info.get('address_line1') or provider_info.get('address')
-            city = provider_info.get('city')
-            state = provider_info.get('state')
-            zip_code = provider_info.get('zip_code') or provider_info.get('zip')
-            
-            # Handle other fields
-            languages_spoken = provider_info.get('languages_spoken') or provider_info.get('languages', 'English')
-            accepting_new_patients = provider_info.get('accepting_new_patients', True)
-            quality_rating = provider_info.get('quality_rating', 4.0)
-            patient_volume = provider_info.get('patient_volume', 1000)
-            
-            # Query to insert a new provider with comprehensive fields
-            insert_query = """
-            INSERT INTO provider_network (
-                provider_id, npi_number, provider_name, provider_type, specialty, 
-                product_code, network_tier, address_line1, city, state, zip_code,
-                phone_number, email, languages_spoken, accepting_new_patients,
-                quality_rating, patient_volume
-            ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            RETURNING provider_id, provider_name;
-            """
-            
-            # Execute the prepared statement with the extracted values
-            cursor.execute(insert_query, (
-                provider_id, npi_number, provider_name, provider_type, specialty,
-                product_code, network_tier, address_line1, city, state, zip_code,
-                phone_number, email, languages_spoken, accepting_new_patients,
-                quality_rating, patient_volume
-            ))
-            
-            if cursor.description:
-                results = cursor.fetchall()
-                conn.commit()
-                return f"Successfully inserted provider record: {results}"
-            else:
+            # Apply the defaults per record, then send every row in one statement
+            records = provider_info if isinstance(provider_info, list) else [provider_info]
+            try:
+                rows = [_provider_row(record) for record in records]
+            except ValueError as e:
+                return f"Error: {e}"
+            if not rows:
+                return "Error: no provider records provided"
+            
+            # COPY cannot return rows, so large loads report a count instead
+            if len(rows) > _COPY_THRESHOLD:
+                _copy_rows(cursor, _PROVIDER_COPY, rows)
                 conn.commit()
-                return "Provider insertion completed successfully"
+                return f"Successfully inserted {len(rows)} provider records"
+            
+            results = _insert_rows(cursor, "provider_ins", _PROVIDER_INSERT, rows)
+            conn.commit()
+            return f"Successfully inserted provider record: {results}"
                 
         except Exception as e:
             if conn:
                 conn.rollback()
-            logger.error(f"Provider insertion failed: {e}")
+            logger.error("Provider insertion failed: %s", e)
             return f"Error inserting provider records: {e}"
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
+                self.release_db_connection(conn)
 
 class DuplicateDetectionTool(DatabaseConnectionTool):
     name: str = "duplicate_detection_tool"
@@ -250,20 +424,21 @@ class DuplicateDetectionTool(DatabaseConnectionTool):
         Returns:
             String containing duplicate detection results
         """
+        conn = cursor = None
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            # Query to find potential duplicates based on name and date of birth
-            duplicate_query = """
+            # Find potential duplicates based on name and date of birth; IDs are
+            # listed in rank order, so the record cleanup keeps comes first
+            duplicate_query = _RANKED_MEMBERS_CTE + """
             SELECT 
-                first_name, last_name, date_of_birth,
-                COUNT(*) as duplicate_count,
-                STRING_AGG(member_id, ', ') as member_ids,
-                STRING_AGG(enrollment_date::text, ', ') as enrollment_dates
-            FROM member_enrollment 
-            GROUP BY first_name, last_name, date_of_birth
-            HAVING COUNT(*) > 1
+                first_name, last_name, date_of_birth, group_size,
+                ARRAY_AGG(member_id ORDER BY rn) as member_ids,
+                ARRAY_AGG(enrollment_date ORDER BY rn) as enrollment_dates
+            FROM ranked
+            WHERE group_size > 1
+            GROUP BY first_name, last_name, date_of_birth, group_size
             ORDER BY first_name, last_name;
             """
             
@@ -271,42 +446,54 @@ class DuplicateDetectionTool(DatabaseConnectionTool):
             duplicates = cursor.fetchall()
             
             if duplicates:
-                result = "Duplicate members found:\n"
+                lines = ["Duplicate members found:"]
                 for dup in duplicates:
-                    result += f"Name: {dup[0]} {dup[1]}, DOB: {dup[2]}, Count: {dup[3]}\n"
-                    result += f"Member IDs: {dup[4]}\n"
-                    result += f"Enrollment Dates: {dup[5]}\n---\n"
-                return result
+                    lines.append(f"Name: {dup[0]} {dup[1]}, DOB: {dup[2]}, Count: {dup[3]}")
+                    lines.append(f"Member IDs: {', '.join(dup[4])}")
+                    lines.append(f"Enrollment Dates: {', '.join(map(str, dup[5]))}\n---")
+                return "\n".join(lines) + "\n"
             else:
                 return "No duplicate member records found"
                 
         except Exception as e:
-            logger.error(f"Duplicate detection failed: {e}")
+            logger.error("Duplicate detection failed: %s", e)
             return f"Error detecting duplicates: {e}"
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
+                self.release_db_connection(conn)
 
 class DuplicateCleanupTool(DatabaseConnectionTool):
     name: str = "duplicate_cleanup_tool"
-    description: str = "Remove duplicate member records while preserving the earliest enrollment"
+    description: str = "Remove duplicate member records while preserving the earliest enrollment. Set use_ranked_cleanup instead of passing a query to remove every same-name, same-DOB duplicate in one statement."
     
-    def _run(self, cleanup_query: str) -> str:
+    def _run(self, cleanup_query: str = "", use_ranked_cleanup: bool = False) -> str:
         """
         Clean up duplicate member records
         Args:
-            cleanup_query: SQL query for removing duplicate records
+            cleanup_query: SQL query for removing duplicate records; required unless use_ranked_cleanup is set
+            use_ranked_cleanup: Run the built-in cleanup that keeps the earliest enrollment per duplicate group
         Returns:
             String result of the cleanup operation
         """
+        if not use_ranked_cleanup and not cleanup_query.strip():
+            return "Error cleaning up duplicates: cleanup_query is required unless use_ranked_cleanup is set"
+        
+        conn = cursor = None
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            # Execute the cleanup query provided by the agent
-            cursor.execute(cleanup_query)
+            if use_ranked_cleanup:
+                # Delete everything but the earliest enrollment in each duplicate group
+                cursor.execute(_RANKED_MEMBERS_CTE + """
+                DELETE FROM member_enrollment
+                WHERE member_id IN (SELECT member_id FROM ranked WHERE rn > 1);
+                """)
+            else:
+                # Execute the cleanup query provided by the agent
+                cursor.execute(cleanup_query)
             
             deleted_count = cursor.rowcount
             conn.commit()
@@ -316,13 +503,13 @@ class DuplicateCleanupTool(DatabaseConnectionTool):
         except Exception as e:
             if conn:
                 conn.rollback()
-            logger.error(f"Duplicate cleanup failed: {e}")
+            logger.error("Duplicate cleanup failed: %s", e)
             return f"Error cleaning up duplicates: {e}"
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
+                self.release_db_connection(conn)
 
 class DataValidationTool(DatabaseConnectionTool):
     name: str = "data_validation_tool"
@@ -336,66 +523,34 @@ class DataValidationTool(DatabaseConnectionTool):
         Returns:
             String containing validation results
         """
+        conn = cursor = None
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
             validation_results = []
             
-            # Check member enrollment integrity
-            cursor.execute("""
-                SELECT COUNT(*) FROM member_enrollment me 
-                LEFT JOIN product_catalog pc ON me.product_code = pc.product_code 
-                WHERE pc.product_code IS NULL;
-            """)
-            invalid_products = cursor.fetchone()[0]
-            validation_results.append(f"Members with invalid product codes: {invalid_products}")
-            
-            # Check provider network integrity
-            cursor.execute("""
-                SELECT COUNT(*) FROM provider_network pn 
-                LEFT JOIN product_catalog pc ON pn.product_code = pc.product_code 
-                WHERE pc.product_code IS NULL;
-            """)
-            invalid_provider_products = cursor.fetchone()[0]
-            validation_results.append(f"Providers with invalid product codes: {invalid_provider_products}")
-            
-            # Check for remaining duplicates
-            cursor.execute("""
-                SELECT COUNT(*) FROM (
-                    SELECT first_name, last_name, date_of_birth
-                    FROM member_enrollment 
-                    GROUP BY first_name, last_name, date_of_birth
-                    HAVING COUNT(*) > 1
-                ) duplicates;
-            """)
-            remaining_duplicates = cursor.fetchone()[0]
-            validation_results.append(f"Remaining duplicate member groups: {remaining_duplicates}")
-            
-            # Check total record counts
-            cursor.execute("SELECT COUNT(*) FROM member_enrollment;")
-            total_members = cursor.fetchone()[0]
-            validation_results.append(f"Total member records: {total_members}")
-            
-            cursor.execute("SELECT COUNT(*) FROM provider_network;")
-            total_providers = cursor.fetchone()[0]
-            validation_results.append(f"Total provider records: {total_providers}")
+            # All checks run in one statement, prepared once per pooled connection
+            execute_prepared(cursor, "validate_all", _VALIDATION_QUERY)
+            counts = cursor.fetchone()
+            for (label, _), count in zip(_VALIDATION_CHECKS, counts):
+                validation_results.append(f"{label}: {count}")
             
             return "Data Validation Results:\n" + "\n".join(validation_results)
                 
         except Exception as e:
-            logger.error(f"Data validation failed: {e}")
+            logger.error("Data validation failed: %s", e)
             return f"Error during data validation: {e}"
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
+                self.release_db_connection(conn)
 
 
 class FlexibleDataInsertionTool(DatabaseConnectionTool):
     name: str = "flexible_data_insertion_tool"
-    description: str = "Flexibly insert data into any table with automatic field mapping and default values. Expects JSON with table_name and data fields."
+    description: str = "Flexibly insert data into any table with automatic field mapping and default values. Expects JSON with table_name and data fields, plus optional return_fields (column names, or [\"*\"] for all; defaults to the primary key)."
     
     def _run(self, insertion_data: str) -> str:
         """
@@ -405,14 +560,15 @@ class FlexibleDataInsertionTool(DatabaseConnectionTool):
         Returns:
             String result of the insertion operation
         """
+        conn = cursor = None
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
             # Parse the JSON string
             try:
-                data_info = json.loads(insertion_data)
-            except json.JSONDecodeError as e:
+                data_info = orjson.loads(insertion_data)
+            except orjson.JSONDecodeError as e:
                 return f"Error parsing JSON data: {e}"
             
             # Extract table name and data
@@ -424,73 +580,36 @@ class FlexibleDataInsertionTool(DatabaseConnectionTool):
             if not data_fields:
                 return "Error: data object is required in the JSON data"
             
-            # Get table schema to understand available columns
-            cursor.execute("""
-                SELECT column_name, data_type, is_nullable, column_default
-                FROM information_schema.columns 
-                WHERE table_name = %s 
-                ORDER BY ordinal_position
-            """, (table_name,))
-            
-            columns_info = cursor.fetchall()
-            if not columns_info:
+            # Get the table's insert plan to understand available columns
+            table_plan = _column_plan(cursor, table_name)
+            if table_plan is None:
                 return f"Error: Table '{table_name}' not found or no access"
+            column_plan, primary_key = table_plan
             
-            # Build dynamic INSERT query
+            # Only send back the requested columns, the primary key by default
+            return_fields = data_info.get('return_fields') or primary_key
+            if isinstance(return_fields, str):
+                return_fields = (return_fields,)
+            return_fields = tuple(return_fields)
+            
+            # Build dynamic INSERT query, filling missing values from the plan
             available_columns = []
             values = []
-            placeholders = []
             
-            for col_name, data_type, is_nullable, default_value in columns_info:
-                # Skip auto-generated columns
-                if col_name in ['created_at', 'updated_at']:
-                    continue
-                
-                # Get value from data or use default
+            for col_name, missing_value in column_plan:
                 value = data_fields.get(col_name)
-                
-                # Handle different data types and defaults
                 if value is None:
-                    if default_value is not None:
-                        # Use database default
+                    if missing_value is _DB_DEFAULT:
                         continue
-                    elif is_nullable == 'YES':
-                        # Allow NULL
-                        values.append(None)
-                        available_columns.append(col_name)
-                        placeholders.append('NULL')
-                    else:
-                        # Use sensible defaults based on data type
-                        if 'date' in data_type.lower():
-                            values.append('1900-01-01')
-                        elif 'varchar' in data_type.lower() or 'text' in data_type.lower():
-                            values.append('Unknown')
-                        elif 'int' in data_type.lower() or 'decimal' in data_type.lower():
-                            values.append(0)
-                        elif 'boolean' in data_type.lower():
-                            values.append(False)
-                        else:
-                            values.append('Unknown')
-                        
-                        available_columns.append(col_name)
-                        placeholders.append('%s')
-                else:
-                    values.append(value)
-                    available_columns.append(col_name)
-                    placeholders.append('%s')
+                    value = missing_value
+                available_columns.append(col_name)
+                values.append(value)
             
             if not available_columns:
                 return f"Error: No valid columns found for table '{table_name}'"
             
-            # Build and execute the INSERT query
-            insert_query = f"""
-            INSERT INTO {table_name} ({', '.join(available_columns)})
-            VALUES ({', '.join(placeholders)})
-            RETURNING *;
-            """
-            
-            # Execute the query
-            cursor.execute(insert_query, values)
+            # Build (or reuse) the INSERT query and execute it
+            cursor.execute(_insert_statement(table_name, tuple(available_columns), return_fields), values)
             
             if cursor.description:
                 results = cursor.fetchall()
@@ -503,10 +622,10 @@ class FlexibleDataInsertionTool(DatabaseConnectionTool):
         except Exception as e:
             if conn:
                 conn.rollback()
-            logger.error(f"Flexible data insertion failed: {e}")
+            logger.error("Flexible data insertion failed: %s", e)
             return f"Error during flexible data insertion: {e}"
         finally:
             if cursor:
                 cursor.close()
             if conn:
-                conn.close()
\ No newline at end of file
+                self.release_db_connection(conn)
\ No newline at end of file
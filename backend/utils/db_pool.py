@@ -0,0 +1,37 @@
+import os
+import threading
+from typing import Any, Dict, Optional
+from psycopg2.pool import ThreadedConnectionPool
+from utils.helper import DatabaseConnection
+
+# One pool per distinct set of connection parameters, keyed by their sorted items
+_POOLS: Dict[tuple, ThreadedConnectionPool] = {}
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool(conn_params: Optional[Dict[str, Any]] = None) -> ThreadedConnectionPool:
+    """Return the process-wide pool for conn_params (default: DatabaseConnection's), creating it on first use"""
+    if conn_params is None:
+        conn_params = DatabaseConnection().conn_params
+    key = tuple(sorted(conn_params.items()))
+    pool = _POOLS.get(key)
+    if pool is None:
+        with _POOL_LOCK:
+            pool = _POOLS.get(key)
+            if pool is None:
+                pool = _POOLS[key] = ThreadedConnectionPool(
+                    minconn=1,
+                    maxconn=int(os.getenv('DB_POOL_MAX', '10')),
+                    **conn_params
+                )
+    return pool
+
+
+def get_connection(conn_params: Optional[Dict[str, Any]] = None):
+    """Borrow a connection from the shared pool for conn_params"""
+    return get_pool(conn_params).getconn()
+
+
+def release_connection(conn, conn_params: Optional[Dict[str, Any]] = None):
+    """Return a borrowed connection to the pool it came from (never close it)"""
+    get_pool(conn_params).putconn(conn)
@@ -1,7 +1,11 @@
 import os
 import json
 from langchain_openai import ChatOpenAI
-import psycopg2
+from contextlib import contextmanager
+from functools import lru_cache
+
+# Ticket file contents keyed by path, stored with the mtime_ns they were read at
+_FILE_CACHE = {}
 
 def load_initial_files():
     """Load ticket content from initial_files folder"""
@@ -13,8 +17,15 @@ def load_initial_files():
         
         # Load ticket description
         ticket_file_path = os.path.join(backend_dir, 'initial_files', 'ticket_description.txt')
-        if not os.path.exists(ticket_file_path):
+        try:
+            mtime = os.stat(ticket_file_path).st_mtime_ns
+        except FileNotFoundError:
             raise FileNotFoundError(f"Ticket file not found at: {ticket_file_path}")
+        
+        # Only re-read the file when it has changed since the last load
+        cached = _FILE_CACHE.get(ticket_file_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
             
         with open(ticket_file_path, 'r', encoding='utf-8') as f:
             ticket_content = f.read().strip()
@@ -25,6 +36,7 @@ def load_initial_files():
         
         print(f"✅ Loaded ticket content: {len(ticket_content)} characters")
         
+        _FILE_CACHE[ticket_file_path] = (mtime, ticket_content)
         return ticket_content
         
     except FileNotFoundError as e:
@@ -41,8 +53,9 @@ def reload_initial_files():
     print("🔄 Reloading initial files...")
     return load_initial_files()
 
+@lru_cache(maxsize=1)
 def get_llm_config():
-    """Get LLM configuration using environment variables"""
+    """Get the shared LLM client configured from environment variables (call cache_clear() after changing them)"""
     try:
         # Create ChatOpenAI instance using environment variables
         llm = ChatOpenAI(
@@ -67,5 +80,14 @@ class DatabaseConnection:
             'password': os.getenv('DB_PASSWORD', 'postgres')
         }
     
+    @contextmanager
     def get_connection(self):
-        return psycopg2.connect(**self.conn_params)
\ No newline at end of file
+        """Borrow a pooled connection; commit on success, roll back on error, then return it"""
+        # Imported here because utils.db_pool builds its pool from DatabaseConnection
+        from utils.db_pool import get_connection, release_connection
+        conn = get_connection()
+        try:
+            with conn:
+                yield conn
+        finally:
+            release_connection(conn)
\ No newline at end of file
@@ -0,0 +1,36 @@
+import threading
+import weakref
+from typing import Any, Callable, Hashable, Optional, Sequence, Union
+
+from psycopg2 import sql
+
+# Statement names PREPAREd on each connection, keyed by the caller's statement key;
+# weak keys forget a connection (and its prepared plans) once the pool closes it
+_PREPARED: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_PREPARED_LOCK = threading.Lock()
+
+Statement = Union[str, sql.Composable]
+
+
+def execute_prepared(cursor, key: Hashable, statement: Union[Statement, Callable[[], Statement]],
+                     params: Optional[Sequence[Any]] = None):
+    """EXECUTE the server-side prepared statement for key, PREPAREing it on the connection's first use"""
+    # statement uses $1..$n placeholders; a callable defers building it until a
+    # connection actually needs to PREPARE it
+    with _PREPARED_LOCK:
+        names = _PREPARED.setdefault(cursor.connection, {})
+    name = names.get(key)
+    if name is None:
+        if callable(statement):
+            statement = statement()
+        if not isinstance(statement, sql.Composable):
+            statement = sql.SQL(statement)
+        name = f"stmt_{len(names)}"
+        # PREPARE is session-scoped and survives a failed EXECUTE or ROLLBACK,
+        # so record the name as soon as the server has accepted it
+        cursor.execute(sql.SQL("PREPARE {} AS {}").format(sql.Identifier(name), statement))
+        names[key] = name
+    execute = sql.SQL("EXECUTE {}").format(sql.Identifier(name))
+    if params:
+        execute += sql.SQL(" ({})").format(sql.SQL(", ").join(sql.Placeholder() * len(params)))
+    cursor.execute(execute, params or None)
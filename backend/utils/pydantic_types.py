@@ -1,39 +1,37 @@
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Optional, List
 
-from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Shared by every model below: core schemas are built on first validation/serialization,
+# not at import
+_COMMON_CFG = ConfigDict(defer_build=True)
+
+# Structured LLM outputs are read once and never mutated; forbidding extras also
+# emits additionalProperties: false in the JSON schema handed to the LLM
+_OUTPUT_CFG = ConfigDict(defer_build=True, frozen=True, extra='forbid')
 
 
 class TicketAnalysis(BaseModel):
     route_string: str = Field(description="The route identifier (word/phrase) that matches one of the available handlers, or 'default_handler' if no specific match is found.")
 
+    model_config = _OUTPUT_CFG
+
 class DuplicateAnalysis(BaseModel):
     tables: List[str] = Field(description="The list of tables that need duplicate checking")
     fields: List[str] = Field(description="The list of fields that need duplicate checking")
 
+    model_config = _COMMON_CFG
+
 class QueryResolutionOutput(BaseModel):
     query_status: str = Field(description="The status of the query")
     query_resolution: str = Field(description="The resolution of the query")
     query_resolution_reason: str = Field(description="The reason for the query resolution")
     query_resolution_action: str = Field(description="The action to be taken to resolve the query")
 
-
-########### DB REASONING ###########
-
-
+    model_config = _OUTPUT_CFG
 
 
-
-class DuplicateAnalysis(BaseModel):
-    tables: List[str] = Field(description="The list of tables that need duplicate checking")
-    fields: List[str] = Field(description="The list of fields that need duplicate checking")
-
-class QueryResolutionOutput(BaseModel):
-    query_status: str = Field(description="The status of the query")
-    query_resolution: str = Field(description="The resolution of the query")
-    query_resolution_reason: str = Field(description="The reason for the query resolution")
-    query_resolution_action: str = Field(description="The action to be taken to resolve the query")
+########### DB REASONING ###########
 
 # New models for database complex reasoning
 class MemberInsertionOutput(BaseModel):
@@ -43,6 +41,8 @@ class MemberInsertionOutput(BaseModel):
     error_details: Optional[str] = Field(description="Details of any errors encountered during insertion")
     foreign_key_validation: str = Field(description="Confirmation that all foreign key constraints are satisfied")
 
+    model_config = _OUTPUT_CFG
+
 class ProviderInsertionOutput(BaseModel):
     inserted_provider_count: int = Field(description="Number of provider records successfully inserted")
     inserted_provider_ids: List[str] = Field(description="List of provider IDs that were inserted")
@@ -50,13 +50,27 @@ class ProviderInsertionOutput(BaseModel):
     network_assignments: List[str] = Field(description="List of network and product assignments for inserted providers")
     credentialing_status: str = Field(description="Confirmation that all providers have completed credentialing requirements")
 
+    model_config = _OUTPUT_CFG
+
+class DuplicateMemberDetail(BaseModel):
+    first_name: str = Field(description="First name shared by the duplicate group")
+    last_name: str = Field(description="Last name shared by the duplicate group")
+    date_of_birth: str = Field(description="Date of birth shared by the duplicate group")
+    duplicate_count: int = Field(description="Number of records in the duplicate group")
+    member_ids: List[str] = Field(description="Member IDs in the group, the record to keep first")
+    enrollment_dates: List[str] = Field(description="Enrollment dates of the group's records, in the same order as member_ids")
+
+    model_config = _COMMON_CFG
+
 class DuplicateDetectionOutput(BaseModel):
     duplicate_groups_found: int = Field(description="Number of duplicate member groups identified")
-    duplicate_member_details: List[Dict[str, Any]] = Field(description="Details of each duplicate group including member IDs and personal information")
+    duplicate_member_details: List[DuplicateMemberDetail] = Field(description="Details of each duplicate group including member IDs and personal information")
     total_duplicate_records: int = Field(description="Total number of duplicate records identified")
     detection_criteria_used: str = Field(description="Criteria used for identifying duplicates (e.g., name, DOB)")
     recommended_actions: List[str] = Field(description="Recommended actions for resolving each duplicate group")
 
+    model_config = _OUTPUT_CFG
+
 class DuplicateCleanupOutput(BaseModel):
     removed_duplicate_count: int = Field(description="Number of duplicate records successfully removed")
     preserved_record_count: int = Field(description="Number of original records preserved")
@@ -64,26 +78,48 @@ class DuplicateCleanupOutput(BaseModel):
     removed_member_ids: List[str] = Field(description="List of member IDs that were removed as duplicates")
     referential_integrity_status: str = Field(description="Confirmation that referential integrity is maintained")
 
+    model_config = _OUTPUT_CFG
+
+class TableValidationResult(BaseModel):
+    total_records: int = Field(description="Total number of records in the table")
+    invalid_product_codes: int = Field(description="Number of records whose product_code has no match in product_catalog")
+    status: str = Field(description="Validation status for the table (PASSED/FAILED/WARNING)")
+    notes: Optional[str] = Field(default=None, description="Any further findings for the table")
+
+    model_config = _COMMON_CFG
+
 class DataValidationOutput(BaseModel):
     overall_validation_status: str = Field(description="Overall status of data validation (PASSED/FAILED/WARNING)")
-    member_validation_results: Dict[str, Any] = Field(description="Results of member enrollment table validation")
-    provider_validation_results: Dict[str, Any] = Field(description="Results of provider network table validation")
+    member_validation_results: TableValidationResult = Field(description="Results of member enrollment table validation")
+    provider_validation_results: TableValidationResult = Field(description="Results of provider network table validation")
     duplicate_check_results: str = Field(description="Confirmation that no duplicate records remain")
     business_rules_compliance: str = Field(description="Status of business rules compliance validation")
     data_quality_score: Optional[float] = Field(description="Overall data quality score (0-100)")
 
+    model_config = _COMMON_CFG
+
+class TaskExecutionSummary(BaseModel):
+    status: str = Field(description="Outcome of the task (e.g. COMPLETED/FAILED/SKIPPED)")
+    result: str = Field(description="Short summary of what the task did and produced")
+
+    model_config = _COMMON_CFG
+
 class OrchestrationOutput(BaseModel):
     ticket_status: str = Field(description="Overall ticket completion status")
     completed_tasks: List[str] = Field(description="List of successfully completed tasks")
-    task_execution_summary: Dict[str, str] = Field(description="Summary of each task execution with results")
+    task_execution_summary: Dict[str, TaskExecutionSummary] = Field(description="Summary of each task execution with results")
     issues_encountered: List[str] = Field(description="List of any issues encountered during execution")
     issues_resolved: List[str] = Field(description="List of issues that were successfully resolved")
     recommendations: List[str] = Field(description="Recommendations for future operations or improvements")
 
+    model_config = _COMMON_CFG
+
 
 class PlanningOutput(BaseModel):
     steps: List[str] = Field(description="List of steps to be performed")
     agents: List[str] = Field(description="List of agents to be used")
     tasks: List[str] = Field(description="List of tasks to be performed")
     expected_output: str = Field(description="Expected output of the planning task")
-    ticket_content: str = Field(description="Ticket content")
\ No newline at end of file
+    ticket_content: str = Field(description="Ticket content")
+
+    model_config = _OUTPUT_CFG
\ No newline at end of file
@@ -1,6 +1,10 @@
+import io
 import os
 import psycopg2
 
+# Rows loaded into long_running_table when it is empty
+SEED_ROWS = 1000
+
 def run_long_query():
     """Run a long running query to test monitoring"""
     conn_params = {
@@ -25,16 +29,15 @@ def run_long_query():
                 # Insert test data if table is empty
                 cur.execute("SELECT COUNT(*) FROM long_running_table")
                 if cur.fetchone()[0] == 0:
-                    cur.execute("""
-                        INSERT INTO long_running_table (data) 
-                        SELECT 'test_data_' || generate_series(1, 1000)
-                    """)
+                    # Stream the rows through COPY rather than the SQL parser
+                    buf = io.StringIO("".join(f"test_data_{i}\n" for i in range(1, SEED_ROWS + 1)))
+                    cur.copy_expert("COPY long_running_table (data) FROM STDIN", buf)
                 
                 conn.commit()
                 print("Starting long running query...")
                 
-                # Run the long query
-                cur.execute("SELECT pg_sleep(300), COUNT(*) FROM long_running_table WHERE data LIKE '%5%'")
+                # Run the long query; the sleep provides the duration, so the count avoids an unindexed LIKE scan
+                cur.execute("SELECT pg_sleep(300) AS s, (SELECT COUNT(*) FROM long_running_table) AS c")
                 result = cur.fetchone()
                 print(f"Long query completed: {result}")
                 
@@ -3,43 +3,234 @@ Simple and concise database tools with args_schema validation.
 """
 
 import os
-import psycopg2
+import re
+from psycopg2 import sql
+import threading
+import weakref
+from psycopg2.extras import execute_values
+from psycopg2.pool import ThreadedConnectionPool
 import time
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Optional, List, Tuple, Union
 from datetime import datetime
 
 from crewai.tools import BaseTool
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # ========== INPUT SCHEMAS ==========
 
+# Tool arguments are validated once per call and never mutated; unknown arguments are rejected
+_INPUT_CFG = ConfigDict(extra='forbid', frozen=True)
+
 class DatabaseConnectionInput(BaseModel):
     """Input schema for database connection."""
     query: str = Field(default="test", description="SQL query to execute or 'test' for connection check")
 
+    model_config = _INPUT_CFG
+
 class DeleteDuplicatesInput(BaseModel):
     """Input schema for delete duplicates operation."""
     table_name: str = Field(description="Table name to remove duplicates from")
     columns: str = Field(default="", description="Comma-separated columns for duplicate detection")
     dry_run: bool = Field(default=True, description="Only count duplicates without deleting")
 
+    model_config = _INPUT_CFG
+
 class InsertRowInput(BaseModel):
     """Input schema for insert row operation."""
     table_name: str = Field(description="Table name to insert into")
-    row_data: Dict[str, Any] = Field(description="Row data as dictionary")
+    row_data: Union[Dict[str, Any], List[Dict[str, Any]]] = Field(description="Row data as a dictionary, or a list of dictionaries with the same keys")
     validate_only: bool = Field(default=False, description="Only validate without inserting")
 
+    model_config = _INPUT_CFG
+
 class KillSessionInput(BaseModel):
     """Input schema for session management."""
     action: str = Field(description="Action: 'list' or 'kill'")
     session_pid: Optional[str] = Field(default=None, description="Session PID to kill")
     reason: str = Field(default="", description="Reason for termination")
 
+    model_config = _INPUT_CFG
+
 class JiraTicketInput(BaseModel):
     """Input schema for Jira ticket analysis."""
     ticket_data: Dict[str, Any] = Field(description="Jira ticket data dictionary")
 
+    model_config = _INPUT_CFG
+
+
+# ========== OUTPUT SCHEMAS ==========
+
+class TicketAnalysisResult(BaseModel):
+    """Structured result of a Jira ticket analysis."""
+    ticket_id: str = Field(description="Jira ticket identifier")
+    operation: str = Field(description="Detected operation: delete_duplicates, insert_row, kill_session or unknown")
+    table: str = Field(description="Detected table name or 'unknown'")
+    priority: str = Field(description="Ticket priority")
+    complexity: str = Field(description="Assessed complexity: High or Medium")
+    summary: str = Field(description="Ticket summary (first 100 characters)")
+
+    model_config = ConfigDict(defer_build=True, frozen=True, extra='forbid')
+
+
+# ========== CONNECTION POOL ==========
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+# Connection parameters, read from the environment once at import
+_CONN_KW = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'port': os.getenv('DB_PORT', '5433'),
+    'database': os.getenv('DB_NAME', 'testdb'),
+    'user': os.getenv('DB_USER', 'testuser'),
+    'password': os.getenv('DB_PASSWORD', 'testpass'),
+}
+
+def _getconn():
+    """Borrow a pooled connection, creating the pool on first use."""
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                _POOL = ThreadedConnectionPool(1, 8, **_CONN_KW)
+    return _POOL.getconn()
+
+def _putconn(conn):
+    """Return a borrowed connection to the pool."""
+    _POOL.putconn(conn)
+
+
+# ========== PREPARED STATEMENTS ==========
+
+# Statement names already PREPAREd on each pooled connection
+_PREPARED: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_PREPARED_LOCK = threading.Lock()
+
+_STATEMENTS = {
+    'count_tables': "SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public'",
+    'table_columns': """
+        SELECT column_name, is_nullable = 'NO' AND column_default IS NULL
+        FROM information_schema.columns
+        WHERE table_name = $1
+        ORDER BY ordinal_position
+    """,
+    'list_sessions': """
+        SELECT pid, usename, application_name, state,
+               EXTRACT(EPOCH FROM (NOW() - query_start))::int as seconds
+        FROM pg_stat_activity
+        WHERE pid != pg_backend_pid() AND state IS NOT NULL
+        ORDER BY query_start DESC
+    """,
+    'terminate_session': "SELECT pg_terminate_backend($1)",
+}
+
+def _execute_prepared(cursor, name: str, params: tuple = ()):
+    """EXECUTE a statement from _STATEMENTS, PREPAREing it on the connection's first use."""
+    with _PREPARED_LOCK:
+        prepared = _PREPARED.setdefault(cursor.connection, set())
+    execute = f"EXECUTE {name}"
+    if params:
+        execute += f" ({', '.join(['%s'] * len(params))})"
+    if name not in prepared:
+        # PREPARE outlives a failed EXECUTE or ROLLBACK, so record it as soon as it succeeds
+        cursor.execute(f"PREPARE {name} AS {_STATEMENTS[name]}")
+        prepared.add(name)
+    cursor.execute(execute, params or None)
+
+
+# ========== SCHEMA CACHE ==========
+
+# (column_name, required) pairs per table name; only existing tables are stored
+_SCHEMA_CACHE: Dict[str, Tuple[Tuple[str, bool], ...]] = {}
+
+def _table_columns(cursor, table_name: str) -> Tuple[Tuple[str, bool], ...]:
+    """(column_name, required) pairs for a table, looked up on the caller's connection once; empty if it does not exist."""
+    columns = _SCHEMA_CACHE.get(table_name)
+    if columns is None:
+        _execute_prepared(cursor, 'table_columns', (table_name,))
+        columns = tuple(cursor.fetchall())
+        # Unknown tables are not cached so a table created later is found
+        if columns:
+            _SCHEMA_CACHE[table_name] = columns
+    return columns
+
+def _table_exists(cursor, table_name: str) -> bool:
+    """Whether the table exists."""
+    return bool(_table_columns(cursor, table_name))
+
+def _required_cols(cursor, table_name: str) -> Tuple[str, ...]:
+    """Columns that are NOT NULL without a default."""
+    return tuple(col for col, required in _table_columns(cursor, table_name) if required)
+
+def _default_dup_cols(cursor, table_name: str) -> Tuple[str, ...]:
+    """First three data columns, used when no duplicate columns are given."""
+    return tuple(col for col, _ in _table_columns(cursor, table_name) if col not in ('id', 'created_at', 'updated_at'))[:3]
+
+def _invalidate_schema_cache():
+    """Drop cached table metadata; call after DDL."""
+    _SCHEMA_CACHE.clear()
+
+# ========== QUERY TEMPLATES ==========
+
+def _identifiers(names: Tuple[str, ...]) -> sql.Composed:
+    """Comma-separated, safely quoted column identifiers."""
+    return sql.SQL(', ').join(map(sql.Identifier, names))
+
+@lru_cache(maxsize=128)
+def _dup_count(table_name: str, cols: Tuple[str, ...]) -> sql.Composed:
+    """Duplicate group count and surplus row count for table_name grouped by cols."""
+    return sql.SQL("""
+        SELECT COUNT(*) AS groups, COALESCE(SUM(c) - COUNT(*), 0) AS extra_rows
+        FROM (
+            SELECT COUNT(*) AS c
+            FROM {table}
+            GROUP BY {cols}
+            HAVING COUNT(*) > 1
+        ) s
+    """).format(table=sql.Identifier(table_name), cols=_identifiers(cols))
+
+@lru_cache(maxsize=128)
+def _dup_delete(table_name: str, cols: Tuple[str, ...]) -> sql.Composed:
+    """Delete all but the lowest id in every group of rows sharing cols."""
+    return sql.SQL("""
+        DELETE FROM {table} WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (PARTITION BY {cols} ORDER BY id) as rn
+                FROM {table}
+            ) t WHERE rn > 1
+        )
+    """).format(table=sql.Identifier(table_name), cols=_identifiers(cols))
+
+@lru_cache(maxsize=128)
+def _insert_template(table_name: str, columns: Tuple[str, ...], returning_id: bool) -> sql.Composed:
+    """Multi-row INSERT for execute_values, optionally returning the new ids."""
+    return sql.SQL("INSERT INTO {table} ({cols}) VALUES %s{returning}").format(
+        table=sql.Identifier(table_name),
+        cols=_identifiers(columns),
+        returning=sql.SQL(" RETURNING id" if returning_id else "")
+    )
+
+
+# ========== TICKET KEYWORDS ==========
+
+_OP_KEYWORDS = (
+    ('delete_duplicates', ('duplicate', 'remove duplicate')),
+    ('insert_row', ('insert', 'add', 'create')),
+    ('kill_session', ('kill', 'terminate', 'session')),
+)
+_TABLES = ('member_enrollment', 'product_catalog', 'provider_network', 'claims_authorization')
+_TABLE_VARIANTS = tuple((t, (t, t.replace('_', ' '))) for t in _TABLES)
+
+# Every keyword mapped to what it signals; operations and tables are resolved in the priority order above
+_TICKET_TERMS = {
+    **{word: op for op, words in _OP_KEYWORDS for word in words},
+    **{variant: t for t, variants in _TABLE_VARIANTS for variant in variants},
+    'urgent': 'High', 'critical': 'High',
+}
+# One case-insensitive alternation (longest keyword first) so the ticket text is scanned once
+_TICKET_RE = re.compile('|'.join(sorted(map(re.escape, _TICKET_TERMS), key=len, reverse=True)), re.IGNORECASE)
 
 # ========== TOOLS ==========
 
@@ -51,18 +242,13 @@ class DatabaseConnectionTool(BaseTool):
     args_schema: type = DatabaseConnectionInput
 
     def _run(self, query: str = "test") -> str:
+        conn = None
         try:
-            conn = psycopg2.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5433'),
-                database=os.getenv('DB_NAME', 'testdb'),
-                user=os.getenv('DB_USER', 'testuser'),
-                password=os.getenv('DB_PASSWORD', 'testpass')
-            )
+            conn = _getconn()
             cursor = conn.cursor()
             
             if query == "test":
-                cursor.execute("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = 'public'")
+                _execute_prepared(cursor, 'count_tables')
                 table_count = cursor.fetchone()[0]
                 result = f"✅ Connected successfully. Found {table_count} tables."
             else:
@@ -74,11 +260,13 @@ class DatabaseConnectionTool(BaseTool):
                     result = "❌ Only SELECT queries allowed for safety"
             
             cursor.close()
-            conn.close()
             return result
             
         except Exception as e:
             return f"❌ Connection failed: {str(e)}"
+        finally:
+            if conn:
+                _putconn(conn)
 
 
 class DeleteDuplicateRowsTool(BaseTool):
@@ -89,125 +277,106 @@ class DeleteDuplicateRowsTool(BaseTool):
     args_schema: type = DeleteDuplicatesInput
 
     def _run(self, table_name: str, columns: str = "", dry_run: bool = True) -> str:
+        conn = None
         try:
-            conn = psycopg2.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5433'),
-                database=os.getenv('DB_NAME', 'testdb'),
-                user=os.getenv('DB_USER', 'testuser'),
-                password=os.getenv('DB_PASSWORD', 'testpass')
-            )
+            conn = _getconn()
             cursor = conn.cursor()
             
             # Check table exists
-            cursor.execute("SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = %s)", (table_name,))
-            if not cursor.fetchone()[0]:
+            if not _table_exists(cursor, table_name):
                 return f"❌ Table '{table_name}' not found"
             
             # Auto-detect columns if not provided
-            if not columns:
-                cursor.execute("""
-                    SELECT column_name FROM information_schema.columns 
-                    WHERE table_name = %s AND column_name NOT IN ('id', 'created_at', 'updated_at')
-                    ORDER BY ordinal_position LIMIT 3
-                """, (table_name,))
-                cols = [row[0] for row in cursor.fetchall()]
-                columns = ", ".join(cols)
+            cols = tuple(col.strip() for col in columns.split(',') if col.strip())
+            if not cols:
+                cols = _default_dup_cols(cursor, table_name)
             
-            # Find duplicates
-            cursor.execute(f"""
-                SELECT {columns}, COUNT(*) as count
-                FROM {table_name}
-                GROUP BY {columns}
-                HAVING COUNT(*) > 1
-            """)
-            duplicates = cursor.fetchall()
+            # Count duplicate groups and surplus rows in the database
+            cursor.execute(_dup_count(table_name, cols))
+            groups, total_dupes = cursor.fetchone()
             
-            if not duplicates:
+            if not groups:
                 result = f"✅ No duplicates found in {table_name}"
             elif dry_run:
-                total_dupes = sum(row[-1] - 1 for row in duplicates)
-                result = f"🔍 Found {len(duplicates)} duplicate groups ({total_dupes} rows to delete)"
+                result = f"🔍 Found {groups} duplicate groups ({total_dupes} rows to delete)"
             else:
                 # Delete duplicates keeping oldest by ID
-                cursor.execute(f"""
-                    DELETE FROM {table_name} WHERE id IN (
-                        SELECT id FROM (
-                            SELECT id, ROW_NUMBER() OVER (PARTITION BY {columns} ORDER BY id) as rn
-                            FROM {table_name}
-                        ) t WHERE rn > 1
-                    )
-                """)
+                cursor.execute(_dup_delete(table_name, cols))
                 deleted = cursor.rowcount
                 conn.commit()
                 result = f"✅ Deleted {deleted} duplicate rows from {table_name}"
             
             cursor.close()
-            conn.close()
             return result
             
         except Exception as e:
             return f"❌ Error: {str(e)}"
+        finally:
+            if conn:
+                _putconn(conn)
 
 
 class InsertRowTool(BaseTool):
     """Insert new rows into database tables."""
     
     name: str = "Insert Row"
-    description: str = "Insert new rows into database tables with validation"
+    description: str = "Insert one or more rows into database tables with validation"
     args_schema: type = InsertRowInput
 
-    def _run(self, table_name: str, row_data: Dict[str, Any], validate_only: bool = False) -> str:
+    def _run(self, table_name: str, row_data: Union[Dict[str, Any], List[Dict[str, Any]]], validate_only: bool = False) -> str:
+        conn = None
         try:
-            conn = psycopg2.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5433'),
-                database=os.getenv('DB_NAME', 'testdb'),
-                user=os.getenv('DB_USER', 'testuser'),
-                password=os.getenv('DB_PASSWORD', 'testpass')
-            )
+            conn = _getconn()
             cursor = conn.cursor()
             
             # Check table exists
-            cursor.execute("SELECT EXISTS (SELECT FROM information_schema.tables WHERE table_name = %s)", (table_name,))
-            if not cursor.fetchone()[0]:
+            if not _table_exists(cursor, table_name):
                 return f"❌ Table '{table_name}' not found"
             
-            # Get required columns
-            cursor.execute("""
-                SELECT column_name FROM information_schema.columns 
-                WHERE table_name = %s AND is_nullable = 'NO' AND column_default IS NULL
-            """, (table_name,))
-            required_cols = [row[0] for row in cursor.fetchall()]
+            # Get table columns, flagging the required ones
+            table_cols = dict(_table_columns(cursor, table_name))
+            required_cols = _required_cols(cursor, table_name)
+            
+            # A single row is a batch of one; every row must share the same keys
+            rows = row_data if isinstance(row_data, list) else [row_data]
+            if not rows:
+                return "❌ No rows to insert"
+            columns = tuple(rows[0].keys())
+            if any(row.keys() != rows[0].keys() for row in rows):
+                return "❌ All rows must have the same columns"
             
-            # Validate required columns
-            missing = [col for col in required_cols if col not in row_data and col != 'id']
+            # Validate columns against the table
+            unknown = [col for col in columns if col not in table_cols]
+            if unknown:
+                return f"❌ Unknown columns for {table_name}: {unknown}"
+            missing = [col for col in required_cols if col not in rows[0] and col != 'id']
             if missing:
                 return f"❌ Missing required columns: {missing}"
             
             if validate_only:
                 return f"✅ Validation passed for {table_name}"
             
-            # Insert row
-            columns = list(row_data.keys())
-            values = list(row_data.values())
-            placeholders = ', '.join(['%s'] * len(values))
-            
-            cursor.execute(f"""
-                INSERT INTO {table_name} ({', '.join(columns)})
-                VALUES ({placeholders})
-                RETURNING id
-            """, values)
-            
-            new_id = cursor.fetchone()[0]
+            # Insert every row in one multi-row VALUES statement
+            returning = 'id' in table_cols
+            new_ids = execute_values(
+                cursor, _insert_template(table_name, columns, returning),
+                [tuple(row[col] for col in columns) for row in rows], page_size=500, fetch=returning
+            )
+            inserted = len(rows)
             conn.commit()
             cursor.close()
-            conn.close()
             
-            return f"✅ Inserted row in {table_name} with ID: {new_id}"
+            if not returning:
+                return f"✅ Inserted {inserted} row(s) in {table_name}"
+            if inserted == 1:
+                return f"✅ Inserted row in {table_name} with ID: {new_ids[0][0]}"
+            return f"✅ Inserted {inserted} rows in {table_name} with IDs: {[row[0] for row in new_ids]}"
             
         except Exception as e:
             return f"❌ Error: {str(e)}"
+        finally:
+            if conn:
+                _putconn(conn)
 
 
 class KillSessionTool(BaseTool):
@@ -218,24 +387,13 @@ class KillSessionTool(BaseTool):
     args_schema: type = KillSessionInput
 
     def _run(self, action: str, session_pid: Optional[str] = None, reason: str = "") -> str:
+        conn = None
         try:
-            conn = psycopg2.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                port=os.getenv('DB_PORT', '5433'),
-                database=os.getenv('DB_NAME', 'testdb'),
-                user=os.getenv('DB_USER', 'testuser'),
-                password=os.getenv('DB_PASSWORD', 'testpass')
-            )
+            conn = _getconn()
             cursor = conn.cursor()
             
             if action == "list":
-                cursor.execute("""
-                    SELECT pid, usename, application_name, state, 
-                           EXTRACT(EPOCH FROM (NOW() - query_start))::int as seconds
-                    FROM pg_stat_activity 
-                    WHERE pid != pg_backend_pid() AND state IS NOT NULL
-                    ORDER BY query_start DESC
-                """)
+                _execute_prepared(cursor, 'list_sessions')
                 sessions = cursor.fetchall()
                 
                 if not sessions:
@@ -250,7 +408,7 @@ class KillSessionTool(BaseTool):
                 if not session_pid:
                     return "❌ session_pid required for kill action"
                 
-                cursor.execute("SELECT pg_terminate_backend(%s)", (session_pid,))
+                _execute_prepared(cursor, 'terminate_session', (int(session_pid),))
                 success = cursor.fetchone()[0]
                 
                 if success:
@@ -264,11 +422,13 @@ class KillSessionTool(BaseTool):
                 result = "❌ Action must be 'list' or 'kill'"
             
             cursor.close()
-            conn.close()
             return result
             
         except Exception as e:
             return f"❌ Error: {str(e)}"
+        finally:
+            if conn:
+                _putconn(conn)
 
 
 class JiraTicketTool(BaseTool):
@@ -285,34 +445,24 @@ class JiraTicketTool(BaseTool):
             description = ticket_data.get('description', '')
             priority = ticket_data.get('priority', 'Medium')
             
-            text = f"{summary} {description}".lower()
+            text = f"{summary} {description}"
+            hits = {_TICKET_TERMS[m.group().lower()] for m in _TICKET_RE.finditer(text)}
             
-            # Detect operation type
-            if any(word in text for word in ['duplicate', 'remove duplicate']):
-                operation = "delete_duplicates"
-            elif any(word in text for word in ['insert', 'add', 'create']):
-                operation = "insert_row"
-            elif any(word in text for word in ['kill', 'terminate', 'session']):
-                operation = "kill_session"
-            else:
-                operation = "unknown"
-            
-            # Detect table
-            tables = ['member_enrollment', 'product_catalog', 'provider_network', 'claims_authorization']
-            table = next((t for t in tables if t in text or t.replace('_', ' ') in text), 'unknown')
+            # Detect operation type and table
+            operation = next((op for op, _ in _OP_KEYWORDS if op in hits), "unknown")
+            table = next((t for t in _TABLES if t in hits), 'unknown')
             
             # Assess complexity
-            complexity = "High" if any(word in text for word in ['urgent', 'critical']) else "Medium"
+            complexity = "High" if "High" in hits else "Medium"
             
-            return f"""
-📋 Ticket Analysis: {ticket_id}
-🎯 Operation: {operation}
-📊 Table: {table}
-⚡ Priority: {priority}
-🔧 Complexity: {complexity}
-
-Summary: {summary[:100]}...
-"""
+            return TicketAnalysisResult(
+                ticket_id=str(ticket_id),
+                operation=operation,
+                table=table,
+                priority=str(priority),
+                complexity=complexity,
+                summary=summary[:100]
+            ).model_dump_json()
             
         except Exception as e:
             return f"❌ Analysis error: {str(e)}"
@@ -324,5 +474,6 @@ __all__ = [
     'DeleteDuplicateRowsTool', 
     'InsertRowTool',
     'KillSessionTool',
-    'JiraTicketTool'
+    'JiraTicketTool',
+    'TicketAnalysisResult'
 ]
\ No newline at end of file